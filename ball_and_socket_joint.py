@@ -1,6 +1,18 @@
-import trimesh
+import os
+
 import numpy as np
-import polyscope as ps
+import trimesh
+
+from clearance import ball_socket_clearance, with_feature
+from csg_cache import cache_for, cached_difference
+from design_graph import DesignGraph
+from mesh_distance import check_minimum_distance, minimum_distance, penetration
+from posed_mesh import PosedMesh
+from range_of_motion import range_of_motion
+from sdf import SignedDistanceField
+from socket_shell import shell_profile, shell_steps, truncated_shell
+from templates import affine, combined, revolved
+from tessellation import sections_for, subdivisions_for
 
 # ========================================
 # PARAMETERS (ADJUSTED FOR 3D PRINTING)
@@ -11,144 +23,277 @@ stud_length = 20
 socket_thickness = 3
 socket_opening = 0.6
 clearance = 0.5  # Increased from 0.2 to 0.4 for reliable FDM printing
+highlight_collisions = True  # bake socket SDF, shade ball by clearance
+view_lod = "coarse"          # chordal tolerance for checks, sweeps and the viewer
+export_lod = "fine"          # chordal tolerance for exported parts
+build_method = "profile"     # "csg" for the boolean reference parts (cached on disk)
+
+downloads_dir = os.path.expanduser("~/Downloads")
 
 # ========================================
 # 1. CREATE BALL with STUD
 # ========================================
-ball = trimesh.primitives.Sphere(radius=ball_radius, subdivisions=3)
-stud = trimesh.primitives.Cylinder(radius=stud_radius, height=stud_length, sections=32)
-stud.apply_translation([0, 0, stud_length/2 + ball_radius])
-ball_assembly = trimesh.util.concatenate([ball, stud])
+def build_ball(ball_radius=ball_radius, stud_radius=stud_radius, stud_length=stud_length, lod=None):
+    """Ball with a cylindrical stud along +Z"""
+    ball = trimesh.primitives.Sphere(
+        radius=ball_radius, subdivisions=subdivisions_for(ball_radius, lod, 3)
+    )
+    return trimesh.util.concatenate([ball, build_stud(ball_radius, stud_radius, stud_length, lod)])
+
+def build_stud(ball_radius=ball_radius, stud_radius=stud_radius, stud_length=stud_length, lod=None):
+    """The ball's stud on its own, as build_ball() places it"""
+    stud = trimesh.primitives.Cylinder(
+        radius=stud_radius, height=stud_length, sections=sections_for(stud_radius, lod, 32)
+    )
+    stud.apply_translation([0, 0, stud_length/2 + ball_radius])
+    return stud
 
 # ========================================
 # 2. CREATE SOCKET
 # ========================================
-outer_radius = ball_radius + clearance + socket_thickness
-inner_radius = ball_radius + clearance
-
-outer_sphere = trimesh.primitives.Sphere(radius=outer_radius, subdivisions=3)
-inner_sphere = trimesh.primitives.Sphere(radius=inner_radius, subdivisions=3)
-
-cut_height = ball_radius * socket_opening
-cutting_box = trimesh.creation.box([outer_radius*3, outer_radius*3, outer_radius*2])
-cutting_box.apply_translation([0, 0, cut_height + outer_radius])
+def build_socket(
+    ball_radius=ball_radius,
+    clearance=clearance,
+    socket_thickness=socket_thickness,
+    socket_opening=socket_opening,
+    sections=64,
+    lod=None,
+    method="profile",
+    backend=None,
+    cache=None,
+):
+    """
+    Spherical shell around the ball, cut open at ball_radius * socket_opening
+    method="csg" builds the boolean reference (icospheres minus a box) instead,
+    with the boolean `backend` from booleans.py. `lod` (tessellation.py)
+    overrides the fixed tessellation.
+    """
+    outer_radius = ball_radius + clearance + socket_thickness
+    inner_radius = ball_radius + clearance
+    cut_height = ball_radius * socket_opening
 
-socket_shell = outer_sphere.difference(inner_sphere)
-socket_assembly = socket_shell.difference(cutting_box)
+    if method == "profile":
+        # Revolved directly: no booleans, rim vertices exactly on the cut plane
+        sections = sections_for(outer_radius, lod, sections, sphere=True)
+        return truncated_shell(inner_radius, outer_radius, cut_height, sections)
+    if method != "csg":
+        raise ValueError(f"unknown method {method!r}")
+    subdivisions = subdivisions_for(outer_radius, lod, 3)
+    return cached_difference(cache, backend,
+                             ("sphere", outer_radius, subdivisions),
+                             [("sphere", inner_radius, subdivisions),
+                              ("box", [outer_radius*3, outer_radius*3, outer_radius*2],
+                               [0, 0, cut_height + outer_radius])])
 
 # ========================================
-# 3. CLEARANCE VERIFICATION (NO FCL REQUIRED)
+# 2b. PARAMETRIC TEMPLATES (FIXED CONNECTIVITY)
 # ========================================
-print("\n🔍 Ball Joint Clearance Analysis")
-print("=" * 50)
-
-print(f"\nGeometry:")
-print(f"  Ball radius: {ball_radius} mm")
-print(f"  Socket inner radius: {inner_radius} mm")
-print(f"  Socket outer radius: {outer_radius} mm")
-print(f"  Design clearance: {clearance} mm")
+def ball_template(ball_radius=ball_radius, stud_radius=stud_radius, stud_length=stud_length, lod=None):
+    """build_ball() whose radii and stud length update in place"""
+    sphere = affine(
+        trimesh.creation.icosphere(subdivisions=subdivisions_for(ball_radius, lod, 3)),
+        lambda ball_radius: (ball_radius, 0.0),
+        {"ball_radius": ball_radius},
+    )
+    stud = affine(
+        trimesh.creation.cylinder(radius=1.0, height=1.0, sections=sections_for(stud_radius, lod, 32)),
+        lambda ball_radius, stud_radius, stud_length: (
+            np.array([stud_radius, stud_radius, stud_length]),
+            np.array([0.0, 0.0, stud_length / 2 + ball_radius]),
+        ),
+        {"ball_radius": ball_radius, "stud_radius": stud_radius, "stud_length": stud_length},
+    )
+    return combined([sphere, stud])
 
-# Simple distance check using bounding boxes and sample points
-def check_minimum_distance(mesh1, mesh2, num_samples=1000):
+def socket_template(
+    ball_radius=ball_radius,
+    clearance=clearance,
+    socket_thickness=socket_thickness,
+    socket_opening=socket_opening,
+    sections=64,
+    lod=None,
+):
     """
-    Estimate minimum distance between two meshes using point sampling
-    Returns minimum distance found
+    build_socket() whose shell radii and cut plane update in place
+    Meridian counts are fixed by the initial design; the cut plane must
+    stay inside the cavity.
     """
-    # Sample points on both surfaces
-    points1 = mesh1.sample(num_samples)
-    points2 = mesh2.sample(num_samples)
-    
-    # For each point on mesh1, find closest point on mesh2
-    min_distances = []
-    for p1 in points1:
-        distances_to_mesh2 = np.linalg.norm(points2 - p1, axis=1)
-        min_distances.append(np.min(distances_to_mesh2))
-    
-    return np.min(min_distances)
-
-print(f"\nDistance Check:")
-print(f"  Computing minimum distance between ball and socket...")
-
-# Estimate minimum distance
-min_dist = check_minimum_distance(ball_assembly, socket_assembly, num_samples=500)
-print(f"  Estimated minimum distance: {min_dist:.3f} mm")
-
-# Check for intersection/overlap
-if min_dist < 0.05:  # Very close = likely overlapping
-    print(f"\n⚠️  WARNING: Ball and socket appear to intersect or touch!")
-    print(f"   → Increase 'clearance' parameter to at least {clearance + 0.2}")
-elif min_dist < clearance * 0.5:  # Distance less than half the design clearance
-    print(f"\n⚠️  WARNING: Actual clearance ({min_dist:.3f} mm) is less than design clearance ({clearance} mm)")
-    print(f"   → This may indicate overlapping geometry")
-elif clearance < 0.3:
-    print(f"\n⚠️  WARNING: Clearance < 0.3mm may be too tight for FDM printing")
-    print(f"   → Recommend clearance = 0.3-0.5 mm for FDM")
-    print(f"   → Recommend clearance = 0.2-0.3 mm for SLA")
-else:
-    print(f"\n✅ Clearance looks good for FDM printing")
-
-# Check stud clearance through socket opening
-stud_tip_height = stud_length + ball_radius
-socket_opening_height = cut_height
-print(f"\nStud Check:")
-print(f"  Stud tip height: {stud_tip_height:.1f} mm")
-print(f"  Socket opening at: {socket_opening_height:.1f} mm")
-
-if stud_tip_height > socket_opening_height:
-    print(f"  ✅ Stud extends through socket opening")
-else:
-    print(f"  ⚠️  Stud may be blocked by socket")
-
-# Bounding box check
-ball_bounds = ball_assembly.bounds
-socket_bounds = socket_assembly.bounds
-print(f"\nBounding Box Check:")
-print(f"  Ball: {ball_bounds[0]} to {ball_bounds[1]}")
-print(f"  Socket: {socket_bounds[0]} to {socket_bounds[1]}")
+    inner_radius = ball_radius + clearance
+    outer_radius = inner_radius + socket_thickness
+    sections = sections_for(outer_radius, lod, sections, sphere=True)
+    steps = shell_steps(inner_radius, outer_radius, ball_radius * socket_opening, sections)
+
+    def profile(ball_radius, clearance, socket_thickness, socket_opening):
+        inner_radius = ball_radius + clearance
+        return shell_profile(
+            inner_radius, inner_radius + socket_thickness, ball_radius * socket_opening, *steps
+        )
+
+    return revolved(profile, sections, {
+        "ball_radius": ball_radius,
+        "clearance": clearance,
+        "socket_thickness": socket_thickness,
+        "socket_opening": socket_opening,
+    })
 
 # ========================================
-# 4. EXPORT MESHES FOR 3D PRINTING (Downloads)
+# 3. CLEARANCE VERIFICATION (NO FCL REQUIRED)
 # ========================================
-import os
+def verify_clearance(
+    ball_assembly,
+    socket_assembly,
+    ball_radius=ball_radius,
+    stud_radius=stud_radius,
+    stud_length=stud_length,
+    clearance=clearance,
+    socket_thickness=socket_thickness,
+    socket_opening=socket_opening,
+    lod=None,
+    method="profile",
+):
+    """
+    Print the clearance, stud and bounding box report for one design
+    `lod` and `method` must match how the socket was built.
+    """
+    outer_radius = ball_radius + clearance + socket_thickness
+    inner_radius = ball_radius + clearance
+    cut_height = ball_radius * socket_opening
+
+    print("\n🔍 Ball Joint Clearance Analysis")
+    print("=" * 50)
+
+    print(f"\nGeometry:")
+    print(f"  Ball radius: {ball_radius} mm")
+    print(f"  Socket inner radius: {inner_radius} mm")
+    print(f"  Socket outer radius: {outer_radius} mm")
+    print(f"  Design clearance: {clearance} mm")
+
+    # Closed-form values from the parameters (faceted worst case)
+    analytic = faceted_clearance(ball_radius, clearance, socket_thickness, lod, method)
+    print(f"  Analytic gap (faceted): {analytic.gap:.3f} mm")
+    print(f"  Analytic wall (faceted): {analytic.wall_thickness:.3f} mm")
 
-downloads_dir = os.path.expanduser("/Users/saishalakkoju/code_projects")
+    # The stud is not a primitive pair with the socket: exact mesh query
+    stud = build_stud(ball_radius, stud_radius, stud_length, lod)
+    with_stud = with_feature(analytic, stud, socket_assembly)
+    print(f"  Gap including stud: {with_stud.gap:.3f} mm")
 
-print("\n📦 Exporting meshes to Downloads...")
+    print(f"\nDistance Check:")
+    print(f"  Computing minimum distance between ball and socket...")
 
-ball_assembly.export(os.path.join(downloads_dir, "ball_joint_ball.obj"))
-socket_assembly.export(os.path.join(downloads_dir, "ball_joint_socket.obj"))
+    # Estimate minimum distance
+    min_dist = check_minimum_distance(ball_assembly, socket_assembly, num_samples=100_000)
+    print(f"  Estimated minimum distance: {min_dist:.3f} mm")
 
-# Combined preview (for visualization, not printing)
-combined = trimesh.util.concatenate([ball_assembly, socket_assembly])
-combined.export(os.path.join(downloads_dir, "ball_joint_complete.obj"))
+    # Exact triangle-level distance (BVH branch-and-bound)
+    exact = minimum_distance(ball_assembly, socket_assembly)
+    min_dist = exact.distance
+    print(f"  Exact minimum distance: {min_dist:.3f} mm")
+    print(f"    between ball face {exact.face1} and socket face {exact.face2}")
 
-print("✅ Exported files to ~/Downloads:")
-print("   - ball_joint_ball.obj (print this)")
-print("   - ball_joint_socket.obj (print this)")
-print("   - ball_joint_complete.obj (preview only)")
+    # Signed check: negative distance = ball penetrates socket
+    contact = penetration(ball_assembly, socket_assembly, seed=0)
+    print(f"  Signed distance: {contact.signed_distance:.3f} mm")
+
+    # Check for intersection/overlap
+    if contact.depth > 0:
+        print(f"\n⚠️  WARNING: Ball and socket intersect!")
+        print(f"   → Penetration depth: {contact.depth:.3f} mm")
+        print(f"   → Overlap volume: {contact.overlap_volume:.2f} mm³")
+        print(f"   → Increase 'clearance' parameter to at least {clearance + contact.depth:.2f}")
+    elif min_dist < 0.05:  # Very close = touching
+        print(f"\n⚠️  WARNING: Ball and socket touch!")
+        print(f"   → Increase 'clearance' parameter to at least {clearance + 0.2}")
+    elif min_dist < clearance * 0.5:  # Distance less than half the design clearance
+        print(f"\n⚠️  WARNING: Actual clearance ({min_dist:.3f} mm) is less than design clearance ({clearance} mm)")
+        print(f"   → This may indicate overlapping geometry")
+    elif clearance < 0.3:
+        print(f"\n⚠️  WARNING: Clearance < 0.3mm may be too tight for FDM printing")
+        print(f"   → Recommend clearance = 0.3-0.5 mm for FDM")
+        print(f"   → Recommend clearance = 0.2-0.3 mm for SLA")
+    else:
+        print(f"\n✅ Clearance looks good for FDM printing")
+
+    # Check stud clearance through socket opening
+    stud_tip_height = stud_length + ball_radius
+    socket_opening_height = cut_height
+    print(f"\nStud Check:")
+    print(f"  Stud tip height: {stud_tip_height:.1f} mm")
+    print(f"  Socket opening at: {socket_opening_height:.1f} mm")
+
+    if stud_tip_height > socket_opening_height:
+        print(f"  ✅ Stud extends through socket opening")
+    else:
+        print(f"  ⚠️  Stud may be blocked by socket")
+
+    # Bounding box check
+    ball_bounds = ball_assembly.bounds
+    socket_bounds = socket_assembly.bounds
+    print(f"\nBounding Box Check:")
+    print(f"  Ball: {ball_bounds[0]} to {ball_bounds[1]}")
+    print(f"  Socket: {socket_bounds[0]} to {socket_bounds[1]}")
+
+def faceted_clearance(ball_radius, clearance, socket_thickness, lod=None, method="profile"):
+    """Closed-form gap and wall of the socket as build_socket() meshes it"""
+    outer_radius = ball_radius + clearance + socket_thickness
+    if method == "csg":
+        faceting = {"subdivisions": subdivisions_for(outer_radius, lod, 3)}
+    else:
+        faceting = {"sections": sections_for(outer_radius, lod, 64, sphere=True)}
+    return ball_socket_clearance(ball_radius, clearance, socket_thickness, **faceting)
+
+def verify_range_of_motion(ball_assembly, socket_assembly):
+    """Print and return the swing/twist range of motion"""
+    # Swing/twist collision sweep of the stud against the socket rim
+    print(f"\nRange of Motion:")
+    rom = range_of_motion(ball_assembly, socket_assembly)
+    print(f"  Feasible swing cone: ±{np.degrees(rom.swing_limit):.1f}°")
+    print(f"  Colliding poses: {rom.collision.mean() * 100:.1f}% of "
+          f"{rom.collision.size} (swing_x, swing_y, twist)")
+    return rom
 
 # ========================================
-# 5. INITIALIZE POLYSCOPE VISUALIZATION
+# 4. EXPORT MESHES FOR 3D PRINTING (Downloads)
 # ========================================
-ps.init()
+def export_meshes(ball_assembly, socket_assembly, out_dir=downloads_dir):
+    """Write the printable parts and a combined preview as OBJ files"""
+    print(f"\n📦 Exporting meshes to {out_dir}...")
+    os.makedirs(out_dir, exist_ok=True)
+
+    ball_assembly.export(os.path.join(out_dir, "ball_joint_ball.obj"))
+    socket_assembly.export(os.path.join(out_dir, "ball_joint_socket.obj"))
+
+    # Combined preview (for visualization, not printing)
+    combined = trimesh.util.concatenate([ball_assembly, socket_assembly])
+    combined.export(os.path.join(out_dir, "ball_joint_complete.obj"))
+
+    print(f"✅ Exported files to {out_dir}:")
+    print("   - ball_joint_ball.obj (print this)")
+    print("   - ball_joint_socket.obj (print this)")
+    print("   - ball_joint_complete.obj (preview only)")
 
 # ========================================
-# 6. BALL JOINT SIMULATOR CLASS
+# 5. BALL JOINT SIMULATOR CLASS
 # ========================================
 class BallJointSimulator:
-    def __init__(self, socket_mesh, ball_mesh, pivot_point=None):
+    def __init__(self, socket_mesh, ball_mesh, pivot_point=None, swing_limit=np.pi / 4, sdf=None):
         self.socket = socket_mesh.copy()
-        self.ball = ball_mesh.copy()
-        self.ball_original = ball_mesh.copy()  # Keep original for reset
+        self.sdf = sdf  # baked socket SDF for per-frame collision shading
+        self.ball = ball_mesh.copy()  # Rest pose, never modified
+        self.ball_posed = PosedMesh(self.ball)  # reused output buffer
         self.pivot = pivot_point if pivot_point is not None else np.array([0, 0, 0])
         
         # Constraint limits (in radians)
-        self.swing_limit = np.pi / 4  # 45 degrees
+        self.swing_limit = swing_limit  # 45 degrees unless measured
         self.twist_limit = np.pi      # 180 degrees
         
         # Current rotation state
         self.current_rotation = np.eye(4)
         
+        # Polyscope structures, registered once on first update
+        self.socket_mesh = None
+        self.ball_mesh = None
+        
         # Animation state
         self.frame = 0
         self.angles = np.linspace(-30, 30, 100)
@@ -156,21 +301,21 @@ class BallJointSimulator:
     def swing(self, angle_x, angle_y):
         """Swing motion (rotation perpendicular to twist axis)"""
         # Reset ball to original position
-        self.ball = self.ball_original.copy()
+        self.current_rotation = np.eye(4)
         
         # Apply X rotation (side-to-side swing)
         if abs(angle_x) <= np.degrees(self.swing_limit):
             rot_x = trimesh.transformations.rotation_matrix(
                 np.radians(angle_x), [1, 0, 0], self.pivot
             )
-            self.ball.apply_transform(rot_x)
+            self.current_rotation = rot_x @ self.current_rotation
         
         # Apply Y rotation (forward-back swing)
         if abs(angle_y) <= np.degrees(self.swing_limit):
             rot_y = trimesh.transformations.rotation_matrix(
                 np.radians(angle_y), [0, 1, 0], self.pivot
             )
-            self.ball.apply_transform(rot_y)
+            self.current_rotation = rot_y @ self.current_rotation
     
     def twist(self, angle_z):
         """Twist motion (rotation around twist axis)"""
@@ -178,12 +323,14 @@ class BallJointSimulator:
             rot_z = trimesh.transformations.rotation_matrix(
                 np.radians(angle_z), [0, 0, 1], self.pivot
             )
-            self.ball.apply_transform(rot_z)
+            self.current_rotation = rot_z @ self.current_rotation
     
-    def update_visualization(self):
-        """Update the polyscope visualization"""
-        # Update socket (fixed)
-        ps.register_surface_mesh(
+    def register(self):
+        """Upload socket and ball geometry to polyscope (once)"""
+        import polyscope as ps
+
+        # Socket (fixed)
+        self.socket_mesh = ps.register_surface_mesh(
             "socket",
             self.socket.vertices,
             self.socket.faces,
@@ -191,8 +338,8 @@ class BallJointSimulator:
             transparency=0.5
         )
         
-        # Update ball (moving)
-        ps.register_surface_mesh(
+        # Ball (moving, posed by transform only)
+        self.ball_mesh = ps.register_surface_mesh(
             "ball",
             self.ball.vertices,
             self.ball.faces,
@@ -200,6 +347,23 @@ class BallJointSimulator:
             transparency=0.3
         )
     
+    def update_visualization(self):
+        """Update the polyscope visualization"""
+        if self.ball_mesh is None:
+            self.register()
+        
+        self.ball_mesh.set_transform(self.current_rotation)
+
+        # Per-vertex clearance from the baked SDF (negative = collision)
+        if self.sdf is not None:
+            vertices = self.ball_posed.apply(self.current_rotation)
+            self.ball_mesh.add_scalar_quantity(
+                "clearance",
+                self.sdf(vertices),
+                enabled=True,
+                cmap="coolwarm"
+            )
+    
     def animation_callback(self):
         """Callback for animated swing"""
         angle = self.angles[self.frame % len(self.angles)]
@@ -208,24 +372,118 @@ class BallJointSimulator:
         self.frame += 1
 
 # ========================================
-# 7. CREATE AND VISUALIZE
+# 6. SWEEP VARIANT (see sweep.py)
 # ========================================
-simulator = BallJointSimulator(socket_assembly, ball_assembly, pivot_point=np.array([0, 0, 0]))
+def evaluate(
+    ball_radius=ball_radius,
+    stud_radius=stud_radius,
+    stud_length=stud_length,
+    clearance=clearance,
+    socket_thickness=socket_thickness,
+    socket_opening=socket_opening,
+    lod=view_lod,
+    method="profile",
+    export_dir=None,
+    cache=None,
+):
+    """
+    Build and check one design, exporting it if export_dir is given
+    method="csg" reuses booleans through `cache` (default: the on-disk CSGCache).
+    """
+    cache = cache_for(method) if cache is None else cache
+    ball = build_ball(ball_radius, stud_radius, stud_length, lod=lod)
+    socket = build_socket(ball_radius, clearance, socket_thickness, socket_opening,
+                          lod=lod, method=method, cache=cache)
+
+    analytic = faceted_clearance(ball_radius, clearance, socket_thickness, lod, method)
+
+    if export_dir is not None:
+        os.makedirs(export_dir, exist_ok=True)
+        build_ball(ball_radius, stud_radius, stud_length, lod=export_lod).export(
+            os.path.join(export_dir, "ball_joint_ball.obj"))
+        build_socket(ball_radius, clearance, socket_thickness, socket_opening,
+                     lod=export_lod, method=method, cache=cache).export(
+            os.path.join(export_dir, "ball_joint_socket.obj"))
+
+    return {
+        "gap": analytic.gap,
+        "wall_thickness": analytic.wall_thickness,
+        "min_distance": minimum_distance(ball, socket).distance,
+    }
+
+# ========================================
+# 7. DEPENDENCY GRAPH (INCREMENTAL REBUILD)
+# ========================================
+def design_graph(lod=view_lod, **overrides):
+    """
+    Parameter -> part graph of this joint (see design_graph.py)
+    e.g. changing `clearance` rebuilds the socket and its analyses, never the ball.
+    """
+    graph = DesignGraph(
+        ball_radius=ball_radius,
+        stud_radius=stud_radius,
+        stud_length=stud_length,
+        clearance=clearance,
+        socket_thickness=socket_thickness,
+        socket_opening=socket_opening,
+        lod=lod,
+    )
+    graph.set(**overrides)
+
+    graph.add("ball", build_ball, ["ball_radius", "stud_radius", "stud_length", "lod"])
+    graph.add("socket", build_socket,
+              ["ball_radius", "clearance", "socket_thickness", "socket_opening", "lod"])
+    graph.add("analytic", faceted_clearance, ["ball_radius", "clearance", "socket_thickness", "lod"])
+    graph.add("min_distance", lambda ball, socket: minimum_distance(ball, socket).distance,
+              inputs=["ball", "socket"])
+    graph.add("range_of_motion", lambda ball, socket: range_of_motion(ball, socket),
+              inputs=["ball", "socket"])
+    graph.add("sdf", lambda socket: SignedDistanceField(socket), inputs=["socket"])
+    return graph
+
+# ========================================
+# 8. CREATE AND VISUALIZE
+# ========================================
+def main(out_dir=downloads_dir, method=build_method):
+    """Build, verify and export the joint, then open the viewer"""
+    import polyscope as ps
+
+    # Coarse LOD for checks, sweep and viewer, fine LOD for what gets printed
+    cache = cache_for(method)
+    ball_assembly = build_ball(lod=view_lod)
+    socket_assembly = build_socket(lod=view_lod, method=method, cache=cache)
+
+    verify_clearance(ball_assembly, socket_assembly, lod=view_lod, method=method)
+    rom = verify_range_of_motion(ball_assembly, socket_assembly)
+    export_meshes(build_ball(lod=export_lod), build_socket(lod=export_lod, method=method, cache=cache), out_dir)
+
+    ps.init()
+
+    simulator = BallJointSimulator(
+        socket_assembly, ball_assembly,
+        pivot_point=np.array([0, 0, 0]),
+        swing_limit=rom.swing_limit,
+        sdf=SignedDistanceField(socket_assembly) if highlight_collisions else None,
+    )
+
+    print("\n🎮 Ball Joint Simulator - Polyscope")
+    print("=" * 50)
+    print(f"\nConstraints:")
+    print(f"  Swing limit: ±{np.degrees(simulator.swing_limit):.1f}°")
+    print(f"  Twist limit: ±{np.degrees(simulator.twist_limit):.1f}°")
+
+    # Initial visualization
+    simulator.update_visualization()
 
-print("\n🎮 Ball Joint Simulator - Polyscope")
-print("=" * 50)
-print(f"\nConstraints:")
-print(f"  Swing limit: ±{np.degrees(simulator.swing_limit):.1f}°")
-print(f"  Twist limit: ±{np.degrees(simulator.twist_limit):.1f}°")
+    # Set up animation callback
+    ps.set_user_callback(simulator.animation_callback)
 
-# Initial visualization
-simulator.update_visualization()
+    # Show the viewer
+    print("\n✅ Opening Polyscope viewer...")
+    print("   Press SPACE to pause/resume animation")
+    print("   Use mouse to rotate view")
+    ps.show()
 
-# Set up animation callback
-ps.set_user_callback(simulator.animation_callback)
 
-# Show the viewer
-print("\n✅ Opening Polyscope viewer...")
-print("   Press SPACE to pause/resume animation")
-print("   Use mouse to rotate view")
-ps.show()
+if __name__ == "__main__":
+    main()
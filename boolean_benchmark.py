@@ -0,0 +1,77 @@
+import time
+
+import booleans
+import ball_and_socket_joint
+import hinge_joint
+import saddle_joint
+
+# ========================================
+# BOOLEAN BACKEND CALIBRATION
+# ========================================
+# Times every available backend on the joints' own CSG reference builds
+# and records the fastest one whose results are all watertight as the
+# default for booleans.difference().
+
+operations = {
+    "ball socket": ball_and_socket_joint.build_socket,
+    "hinge cradle": hinge_joint.build_saddle,
+    "chain hinge cradle": saddle_joint.build_hinge_fixed,
+    "carriage": saddle_joint.build_carriage,
+}
+
+
+def time_backend(backend, repeats=5):
+    """Best-of-`repeats` seconds per operation, and whether all were watertight"""
+    timings = {}
+    watertight = True
+    for name, build in operations.items():
+        best = float("inf")
+        for _ in range(repeats):
+            start = time.perf_counter()
+            mesh = build(method="csg", backend=backend)
+            best = min(best, time.perf_counter() - start)
+        timings[name] = best
+        watertight &= bool(mesh.is_watertight)
+    return timings, watertight
+
+
+def calibrate(repeats=5, record=True):
+    """Benchmark every available backend; return (chosen backend, results)"""
+    results = {}
+    for backend in booleans.available_backends():
+        try:
+            results[backend] = time_backend(backend, repeats)
+        except Exception as exc:  # a broken backend just loses the race
+            print(f"  {backend}: failed ({exc})")
+
+    valid = {
+        backend: sum(timings.values())
+        for backend, (timings, watertight) in results.items()
+        if watertight
+    }
+    if not valid:
+        raise RuntimeError("no backend produced watertight results")
+
+    best = min(valid, key=valid.get)
+    if record:
+        booleans.record_default(best, {
+            backend: timings for backend, (timings, _) in results.items()
+        })
+    return best, results
+
+
+def main(repeats=5):
+    best, results = calibrate(repeats)
+
+    print("\n⏱  Boolean backend calibration (best of %d, ms)" % repeats)
+    print(f"  {'backend':<18}" + "".join(f"{name:>20}" for name in operations) + "  watertight")
+    for backend, (timings, watertight) in results.items():
+        row = "".join(f"{timings[name] * 1e3:20.2f}" for name in operations)
+        print(f"  {backend:<18}{row}  {'yes' if watertight else 'NO'}")
+
+    print(f"\n✅ Default backend: {best}")
+    print(f"   recorded in {booleans.calibration_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+import json
+import os
+from functools import lru_cache
+
+import numpy as np
+import trimesh
+
+# ========================================
+# N-ARY BOOLEANS IN ONE ENGINE CALL
+# ========================================
+# `a.difference(b).difference(c)` runs the engine twice and converts the
+# intermediate mesh back to a Trimesh (and re-checks it is a volume) in
+# between. Here the whole operand list is handed over at once: with
+# manifold3d the operands are converted in float64 and subtracted in a
+# single batch; other engines get one trimesh.boolean call.
+#
+# Backends are selected by name. Without one, the backend recorded by
+# boolean_benchmark.py (fastest watertight on the joint parts) is used,
+# falling back to the first available one.
+
+try:
+    import manifold3d
+except ImportError:
+    manifold3d = None
+
+calibration_path = os.path.expanduser("~/.cache/articulated_joints/boolean_backend.json")
+
+
+def _to_manifold(mesh):
+    return manifold3d.Manifold(manifold3d.Mesh64(
+        vert_properties=np.array(mesh.vertices, dtype=np.float64),
+        tri_verts=np.array(mesh.faces, dtype=np.uint64),
+    ))
+
+
+def _from_manifold(result):
+    out = result.to_mesh64()
+    return trimesh.Trimesh(
+        np.asarray(out.vert_properties)[:, :3],
+        np.asarray(out.tri_verts, dtype=np.int64),
+        process=False,
+    )
+
+
+def _manifold_difference(meshes):
+    return _from_manifold(manifold3d.Manifold.batch_boolean(
+        [_to_manifold(mesh) for mesh in meshes],
+        manifold3d.OpType.Subtract,
+    ))
+
+
+def _trimesh_engine(engine):
+    def run(meshes):
+        return trimesh.boolean.difference(meshes, engine=engine)
+    return run
+
+
+# name -> (is available, difference over [base, *tools])
+backends = {
+    "manifold": (manifold3d is not None, _manifold_difference),
+    "trimesh-manifold": (manifold3d is not None, _trimesh_engine("manifold")),
+    "blender": (trimesh.interfaces.blender.exists, _trimesh_engine("blender")),
+}
+
+
+def available_backends():
+    return [name for name, (available, _) in backends.items() if available]
+
+
+@lru_cache(maxsize=None)
+def default_backend():
+    """Calibrated backend if still available, else the first available one"""
+    available = available_backends()
+    if not available:
+        raise ImportError("no boolean backend available (install manifold3d)")
+    try:
+        with open(calibration_path) as f:
+            recorded = json.load(f).get("backend")
+    except (OSError, ValueError):
+        recorded = None
+    return recorded if recorded in available else available[0]
+
+
+def resolve_backend(backend=None):
+    """Name of the backend `difference(..., backend)` would run"""
+    name = default_backend() if backend is None else backend
+    if name not in backends:
+        raise ValueError(f"unknown boolean backend {name!r}")
+    if not backends[name][0]:
+        raise ImportError(f"boolean backend {name!r} is not available")
+    return name
+
+
+def difference(base, tools, backend=None):
+    """`base` minus every mesh in `tools`, evaluated as one operation"""
+    _, run = backends[resolve_backend(backend)]
+    return run([base, *tools])
+
+
+def record_default(backend, timings):
+    """Persist the calibrated default for later processes"""
+    os.makedirs(os.path.dirname(calibration_path), exist_ok=True)
+    tmp = f"{calibration_path}.{os.getpid()}.tmp"
+    with open(tmp, "w") as f:
+        json.dump({
+            "backend": backend,
+            "timings": timings,
+            "trimesh": trimesh.__version__,
+        }, f, indent=2)
+    os.replace(tmp, calibration_path)
+    default_backend.cache_clear()
@@ -0,0 +1,67 @@
+from collections import namedtuple
+
+from mesh_distance import minimum_distance
+from tessellation import (
+    icosphere_inradius_ratio,
+    polygon_inradius_ratio,
+    revolved_inradius_ratio,
+)
+
+# ========================================
+# CLOSED-FORM CLEARANCE FOR PRIMITIVE PAIRS
+# ========================================
+# Every joint is a convex primitive (sphere / cylinder) seated in a
+# concentric shell, so the gap and wall follow from the parameters alone.
+# Passing the tessellation level gives the faceted (as-meshed) values:
+# vertices sit on the ideal surface while faces are inscribed, so the
+# worst case over any rotation is the vertex radius vs. the face inradius.
+Clearance = namedtuple("Clearance", ["gap", "wall_thickness"])
+
+
+def shell_clearance(radius, clearance, wall, ratio=1.0):
+    """
+    Part of `radius` in a shell whose inner surface is offset by
+    `clearance` and whose wall is `wall` thick
+    `ratio` scales the shell radii to their faceted inradius
+    """
+    inner_radius = radius + clearance
+    outer_radius = inner_radius + wall
+    return Clearance(
+        gap=inner_radius * ratio - radius,
+        wall_thickness=outer_radius * ratio - inner_radius,
+    )
+
+
+def ball_socket_clearance(ball_radius, clearance, socket_thickness, subdivisions=None, sections=None):
+    """
+    Sphere in a spherical shell (ball_and_socket_joint.py / saddle_joint.py)
+    `subdivisions` for an icosphere shell, `sections` for a revolved one
+    """
+    ratio = 1.0
+    if subdivisions is not None:
+        ratio = icosphere_inradius_ratio(subdivisions)
+    elif sections is not None:
+        ratio = revolved_inradius_ratio(sections)
+    return shell_clearance(ball_radius, clearance, socket_thickness, ratio)
+
+
+def hinge_clearance(barrel_radius, clearance, saddle_wall, sections=None):
+    """Cylinder in a cylindrical cradle (hinge_joint.py / saddle_joint.py)"""
+    ratio = 1.0 if sections is None else polygon_inradius_ratio(sections)
+    return shell_clearance(barrel_radius, clearance, saddle_wall, ratio)
+
+
+def slider_clearance(rail_radius, clearance, carriage_radius, sections=None):
+    """Rail in a carriage tube of outer radius `carriage_radius`"""
+    ratio = 1.0 if sections is None else polygon_inradius_ratio(sections)
+    wall = carriage_radius - rail_radius - clearance
+    return shell_clearance(rail_radius, clearance, wall, ratio)
+
+
+def with_feature(report, feature_mesh, fixed_mesh):
+    """
+    Fold a non-primitive feature (e.g. the stud) into an analytic report
+    using the exact mesh query as a fallback
+    """
+    feature_gap = minimum_distance(feature_mesh, fixed_mesh).distance
+    return report._replace(gap=min(report.gap, feature_gap))
@@ -0,0 +1,171 @@
+import hashlib
+import json
+import os
+
+import numpy as np
+import trimesh
+
+from booleans import difference, resolve_backend
+
+# ========================================
+# CONTENT-ADDRESSED CSG RESULT CACHE
+# ========================================
+# Boolean results are keyed by a hash of the operation tree: nested tuples
+# of (operation, backend, operands...) where leaves are primitive
+# parameters, e.g.
+#   ("difference", "manifold", ("sphere", 13.5, 3), ("sphere", 10.5, 3), ("box", ...))
+# The joint scripts describe a difference as leaf specs and call
+# cached_difference, which builds the meshes from the same specs that key
+# the cache, so a key can never drift from what was built.
+# Meshes are stored as uncompressed .npz (float64 vertices, int32 faces)
+# and evicted least-recently-used once the directory exceeds max_bytes.
+FORMAT_VERSION = 1
+
+default_cache_dir = os.path.expanduser("~/.cache/articulated_joints/csg")
+
+
+def cache_key(tree):
+    """Stable hex digest of an operation tree"""
+    payload = json.dumps(
+        [FORMAT_VERSION, trimesh.__version__, tree],
+        default=lambda x: np.asarray(x).tolist(),
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def cache_for(method):
+    """The on-disk cache for method="csg" builds; profile builds need none"""
+    return CSGCache() if method == "csg" else None
+
+
+def cached(cache, tree, build):
+    """`cache.get_or_build(tree, build)`, or just `build()` without a cache"""
+    if cache is None:
+        return build()
+    return cache.get_or_build(tree, build)
+
+
+def primitive(spec):
+    """
+    Mesh of one leaf of an operation tree
+      ("sphere", radius, subdivisions)
+      ("cylinder_x", radius, height, sections)           centred, along x
+      ("cylinder_z", radius, height, sections, offset)   along z, translated
+      ("box", extents, offset)
+    """
+    kind, *args = spec
+    if kind == "sphere":
+        radius, subdivisions = args
+        return trimesh.primitives.Sphere(radius=radius, subdivisions=subdivisions)
+    if kind in ("cylinder_x", "cylinder_z"):
+        radius, height, sections = args[:3]
+        mesh = trimesh.primitives.Cylinder(radius=radius, height=height, sections=sections)
+        if kind == "cylinder_x":
+            mesh.apply_transform(trimesh.transformations.rotation_matrix(np.pi / 2, [0, 1, 0]))
+        else:
+            mesh.apply_translation(args[3])
+        return mesh
+    if kind == "box":
+        extents, offset = args
+        mesh = trimesh.creation.box(extents)
+        mesh.apply_translation(offset)
+        return mesh
+    raise ValueError(f"unknown primitive {kind!r}")
+
+
+def cached_difference(cache, backend, base, tools):
+    """
+    primitive(base) minus every primitive(tool), through `cache` if given
+    The backend is resolved first and keys the cache with the specs, since
+    results differ per backend.
+    """
+    backend = resolve_backend(backend)
+    tree = ("difference", backend, base, *tools)
+    return cached(cache, tree, lambda: difference(primitive(base), [primitive(t) for t in tools], backend))
+
+
+class CSGCache:
+    def __init__(self, directory=default_cache_dir, max_bytes=512 * 2**20):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        os.makedirs(self.directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + ".npz")
+
+    def get(self, tree):
+        """Cached mesh for `tree`, or None on a miss"""
+        path = self._path(cache_key(tree))
+        try:
+            with np.load(path) as data:
+                mesh = trimesh.Trimesh(data["vertices"], data["faces"], process=False)
+        except (OSError, KeyError, ValueError):
+            self.misses += 1
+            return None
+
+        # Touch the entry so eviction sees it as recently used
+        os.utime(path)
+        self.hits += 1
+        return mesh
+
+    def put(self, tree, mesh):
+        path = self._path(cache_key(tree))
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            np.savez(
+                f,
+                vertices=np.asarray(mesh.vertices, dtype=np.float64),
+                faces=np.asarray(mesh.faces, dtype=np.int32),
+            )
+        os.replace(tmp, path)
+        self.evict()
+
+    def get_or_build(self, tree, build):
+        """Return the cached result for `tree`, calling `build()` on a miss"""
+        mesh = self.get(tree)
+        if mesh is None:
+            mesh = build()
+            self.put(tree, mesh)
+        return mesh
+
+    def evict(self):
+        """Drop least-recently-used entries until under max_bytes"""
+        entries = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(".npz"):
+                continue
+            try:
+                stat = os.stat(os.path.join(self.directory, name))
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, name))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, name in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except FileNotFoundError:
+                pass
+            total -= size
+            self.evictions += 1
+
+    def size_bytes(self):
+        return sum(
+            os.path.getsize(os.path.join(self.directory, name))
+            for name in os.listdir(self.directory)
+            if name.endswith(".npz")
+        )
+
+    def stats(self):
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "bytes": self.size_bytes(),
+        }
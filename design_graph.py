@@ -0,0 +1,82 @@
+from collections import Counter
+
+# ========================================
+# PARAMETER -> PART DEPENDENCY GRAPH
+# ========================================
+# Each node (a part, frame or analysis) declares which design parameters
+# and which other nodes it reads. Changing a parameter marks only the
+# nodes that read it, plus everything downstream of them, as stale;
+# stale nodes are rebuilt lazily on the next `get`. Nodes can only read
+# nodes added before them, so the graph is acyclic by construction.
+#
+#   graph.set(clearance=0.45)   # -> {"socket", "analytic", "sdf", ...}
+#   graph.get("min_distance")   # rebuilds the socket, reuses the ball
+
+class DesignGraph:
+    def __init__(self, **params):
+        self.params = dict(params)
+        self.nodes = {}            # name -> (fn, params, inputs)
+        self.values = {}           # name -> last built value
+        self.stale = set()
+        self.builds = Counter()    # name -> number of (re)builds
+
+    def add(self, name, fn, params=(), inputs=()):
+        """
+        Register `name = fn(**params, **inputs)`
+        `params` name design parameters, `inputs` name earlier nodes; both
+        are passed to `fn` as keyword arguments of the same name.
+        """
+        if name in self.nodes:
+            raise ValueError(f"node {name!r} already exists")
+        for p in params:
+            if p not in self.params:
+                raise KeyError(f"unknown parameter {p!r}")
+        for i in inputs:
+            if i not in self.nodes:
+                raise KeyError(f"node {name!r} reads {i!r}, which is not defined yet")
+        self.nodes[name] = (fn, tuple(params), tuple(inputs))
+        self.stale.add(name)
+        return self
+
+    def dependents(self, names):
+        """`names` and every node downstream of them"""
+        found = set(names)
+        # Nodes are stored in dependency order, so one pass suffices
+        for name, (_, _, inputs) in self.nodes.items():
+            if found.intersection(inputs):
+                found.add(name)
+        return found
+
+    def set(self, **changes):
+        """Update parameters; returns the nodes invalidated by the change"""
+        for p in changes:
+            if p not in self.params:
+                raise KeyError(f"unknown parameter {p!r}")
+        changed = {p for p, value in changes.items() if self.params[p] != value}
+        self.params.update(changes)
+
+        direct = {
+            name for name, (_, params, _) in self.nodes.items()
+            if changed.intersection(params)
+        }
+        invalidated = self.dependents(direct)
+        self.stale |= invalidated
+        return invalidated
+
+    def get(self, name):
+        """Current value of a node, rebuilding it and its stale inputs if needed"""
+        fn, params, inputs = self.nodes[name]
+        if name in self.stale:
+            kwargs = {p: self.params[p] for p in params}
+            kwargs.update({i: self.get(i) for i in inputs})
+            self.values[name] = fn(**kwargs)
+            self.builds[name] += 1
+            self.stale.discard(name)
+        return self.values[name]
+
+    def rebuild(self):
+        """Bring every stale node up to date; returns the names rebuilt"""
+        rebuilt = [name for name in self.nodes if name in self.stale]
+        for name in rebuilt:
+            self.get(name)
+        return rebuilt
@@ -0,0 +1,142 @@
+from collections import namedtuple
+
+import numpy as np
+
+# ========================================
+# ANALYTIC FEASIBILITY PRE-FILTER
+# ========================================
+# Closed-form checks that follow from how the builders lay out each part,
+# evaluated over whole parameter arrays (anything that broadcasts) before
+# any mesh is built. `checks` maps each constraint to a boolean array and
+# `feasible` is their conjunction; the other fields are the underlying
+# measurements in mm / radians.
+#
+# Print limits: walls below two 0.4 mm nozzle widths and gaps below
+# 0.1 mm do not survive FDM printing.
+min_wall = 0.8
+min_gap = 0.1
+
+BallSocketFeasibility = namedtuple("BallSocketFeasibility", [
+    "feasible", "checks", "opening_radius", "retention", "stud_clearance_angle",
+    "wall_thickness", "gap",
+])
+HingeFeasibility = namedtuple("HingeFeasibility", [
+    "feasible", "checks", "wall_thickness", "gap",
+])
+SliderFeasibility = namedtuple("SliderFeasibility", [
+    "feasible", "checks", "wall_thickness", "gap", "travel",
+])
+
+
+def _conjunction(checks):
+    return np.logical_and.reduce(np.broadcast_arrays(*checks.values()))
+
+
+def ball_socket_feasibility(
+    ball_radius,
+    stud_radius,
+    clearance,
+    socket_thickness,
+    socket_opening,
+    min_wall=min_wall,
+    min_gap=min_gap,
+    min_swing=0.0,
+):
+    """
+    Ball and socket (ball_and_socket_joint.py)
+    The socket's inner sphere (ball_radius + clearance) is cut at
+    z = ball_radius * socket_opening, leaving a rim of radius
+    sqrt(inner^2 - cut^2). The ball is retained if the cut is above the
+    equator and the rim is narrower than the ball. Swinging the stud by
+    theta brings its side (stud_radius off-axis) onto the rim once
+    theta = acos(cut / inner) - asin(stud_radius / inner); `min_swing`
+    (radians) is the required free swing.
+    """
+    ball_radius = np.asarray(ball_radius, dtype=np.float64)
+    inner_radius = ball_radius + clearance
+    cut_height = ball_radius * socket_opening
+
+    ratio = np.clip(cut_height / inner_radius, -1.0, 1.0)
+    opening_radius = inner_radius * np.sqrt(1 - ratio ** 2)
+    retention = ball_radius - opening_radius
+    stud_angle = np.arccos(ratio) - np.arcsin(np.clip(stud_radius / inner_radius, -1.0, 1.0))
+
+    checks = {
+        "ball_retained": (cut_height > 0) & (retention > 0),
+        "stud_fits_opening": stud_radius < opening_radius,
+        "stud_swing": stud_angle > min_swing,
+        "wall_thickness": np.asarray(socket_thickness) >= min_wall,
+        "gap": np.asarray(clearance) >= min_gap,
+    }
+    return BallSocketFeasibility(
+        feasible=_conjunction(checks),
+        checks=checks,
+        opening_radius=opening_radius,
+        retention=retention,
+        stud_clearance_angle=stud_angle,
+        wall_thickness=np.asarray(socket_thickness, dtype=np.float64),
+        gap=np.asarray(clearance, dtype=np.float64),
+    )
+
+
+def hinge_feasibility(
+    barrel_radius,
+    clearance,
+    saddle_wall,
+    connector_radius,
+    min_wall=min_wall,
+    min_gap=min_gap,
+):
+    """
+    Barrel in a half-ring cradle (hinge_joint.py)
+    The vertical connector has to sit on the barrel, so it may not be
+    wider than it.
+    """
+    checks = {
+        "wall_thickness": np.asarray(saddle_wall) >= min_wall,
+        "gap": np.asarray(clearance) >= min_gap,
+        "connector_on_barrel": np.asarray(connector_radius) <= barrel_radius,
+    }
+    return HingeFeasibility(
+        feasible=_conjunction(checks),
+        checks=checks,
+        wall_thickness=np.asarray(saddle_wall, dtype=np.float64),
+        gap=np.asarray(clearance, dtype=np.float64),
+    )
+
+
+def slider_feasibility(
+    rail_length,
+    carriage_length,
+    slider_clearance,
+    carriage_wall=3.0,
+    min_wall=min_wall,
+    min_gap=min_gap,
+):
+    """
+    Carriage tube on the rail (saddle_joint.py)
+    The tube's outer radius is rail_radius + carriage_wall, so its wall
+    is carriage_wall - slider_clearance; travel is the rail left over.
+    """
+    wall = carriage_wall - np.asarray(slider_clearance, dtype=np.float64)
+    travel = np.asarray(rail_length, dtype=np.float64) - carriage_length
+    checks = {
+        "wall_thickness": wall >= min_wall,
+        "gap": np.asarray(slider_clearance) >= min_gap,
+        "travel": travel > 0,
+    }
+    return SliderFeasibility(
+        feasible=_conjunction(checks),
+        checks=checks,
+        wall_thickness=wall,
+        gap=np.asarray(slider_clearance, dtype=np.float64),
+        travel=travel,
+    )
+
+
+def failed_checks(report, index):
+    """Names of the constraints row `index` violates"""
+    return [
+        name for name, passed in report.checks.items()
+        if not np.broadcast_to(passed, report.feasible.shape)[index]
+    ]
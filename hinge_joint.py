@@ -1,6 +1,17 @@
+import os
+
 import trimesh
 import numpy as np
-import polyscope as ps
+
+from clearance import hinge_clearance
+from csg_cache import cache_for, cached_difference
+from design_graph import DesignGraph
+from mesh_distance import minimum_distance
+from posed_mesh import PosedMesh
+from profiles import annular_sector, annular_sector_caps, extrude
+from sdf import SignedDistanceField
+from templates import affine, combined, extruded
+from tessellation import sections_for
 
 # ======================================================
 # PARAMETERS (OPTIMIZATION-READY)
@@ -17,92 +28,183 @@ max_angle_deg = 120          # articulation limit
 connector_radius = 5.0       # vertical connection ports
 connector_length = 18.0
 
+highlight_collisions = True  # bake saddle SDF, shade barrel by clearance
+view_lod = "coarse"          # chordal tolerance for the viewer
+export_lod = "fine"          # chordal tolerance for exported parts
+build_method = "profile"     # "csg" for the boolean reference parts (cached on disk)
+
 # ======================================================
 # BARREL (MALE ROTATING PART)
 # ======================================================
-barrel = trimesh.primitives.Cylinder(
-    radius=barrel_radius,
-    height=barrel_length,
-    sections=64
-)
+def build_barrel(
+    barrel_radius=barrel_radius,
+    barrel_length=barrel_length,
+    connector_radius=connector_radius,
+    connector_length=connector_length,
+    lod=None,
+):
+    """Barrel along X with a vertical connector"""
+    barrel = trimesh.primitives.Cylinder(
+        radius=barrel_radius,
+        height=barrel_length,
+        sections=sections_for(barrel_radius, lod, 64)
+    )
 
-# Rotate barrel so axis is X
-barrel.apply_transform(
-    trimesh.transformations.rotation_matrix(np.pi / 2, [0, 1, 0])
-)
+    # Rotate barrel so axis is X
+    barrel.apply_transform(
+        trimesh.transformations.rotation_matrix(np.pi / 2, [0, 1, 0])
+    )
 
-# ======================================================
-# ADD VERTICAL CONNECTOR TO BARREL
-# ======================================================
-barrel_connector = trimesh.primitives.Cylinder(
-    radius=connector_radius,
-    height=connector_length,
-    sections=48
-)
-barrel_connector.apply_translation([0, 0, connector_length / 2])
+    # ADD VERTICAL CONNECTOR TO BARREL
+    barrel_connector = trimesh.primitives.Cylinder(
+        radius=connector_radius,
+        height=connector_length,
+        sections=sections_for(connector_radius, lod, 48)
+    )
+    barrel_connector.apply_translation([0, 0, connector_length / 2])
 
-barrel_part = trimesh.util.concatenate([barrel, barrel_connector])
+    return trimesh.util.concatenate([barrel, barrel_connector])
 
 # ======================================================
 # SADDLE (FEMALE CRADLE)
 # ======================================================
-outer_radius = barrel_radius + clearance + saddle_wall
-inner_radius = barrel_radius + clearance
+def build_saddle(
+    barrel_radius=barrel_radius,
+    clearance=clearance,
+    saddle_wall=saddle_wall,
+    saddle_width=saddle_width,
+    lod=None,
+    method="profile",
+    backend=None,
+    cache=None,
+):
+    """
+    Open cylindrical cradle around the barrel
+    method="csg" builds the boolean reference (tube minus a box) instead,
+    with the boolean `backend` from booleans.py. `lod` (tessellation.py)
+    overrides the fixed 64 sections.
+    """
+    outer_radius = barrel_radius + clearance + saddle_wall
+    inner_radius = barrel_radius + clearance
+    sections = sections_for(outer_radius, lod, 64)
 
-outer = trimesh.primitives.Cylinder(
-    radius=outer_radius,
-    height=saddle_width,
-    sections=64
-)
+    if method == "profile":
+        # Half ring (y >= 0) in the YZ plane, extruded along the hinge axis
+        ring = annular_sector(inner_radius, outer_radius, -np.pi / 2, np.pi / 2, sections)
+        caps = annular_sector_caps(sections, -np.pi / 2, np.pi / 2)
+        return extrude(ring, saddle_width, axis=0, center=True, caps=caps)
+    if method != "csg":
+        raise ValueError(f"unknown method {method!r}")
+    # Tube along the barrel axis with its bottom half cut off: an open cradle
+    return cached_difference(cache, backend,
+                             ("cylinder_x", outer_radius, saddle_width, sections),
+                             [("cylinder_x", inner_radius, saddle_width + 1, sections),
+                              ("box", [outer_radius * 3] * 3, [0, -outer_radius * 1.5, 0])])
 
-inner = trimesh.primitives.Cylinder(
-    radius=inner_radius,
-    height=saddle_width + 1,
-    sections=64
-)
+# ======================================================
+# PARAMETRIC TEMPLATES (FIXED CONNECTIVITY)
+# ======================================================
+def barrel_template(
+    barrel_radius=barrel_radius,
+    barrel_length=barrel_length,
+    connector_radius=connector_radius,
+    connector_length=connector_length,
+    lod=None,
+):
+    """build_barrel() whose radii and lengths update in place"""
+    unit_barrel = trimesh.creation.cylinder(
+        radius=1.0, height=1.0, sections=sections_for(barrel_radius, lod, 64)
+    )
+    unit_barrel.apply_transform(
+        trimesh.transformations.rotation_matrix(np.pi / 2, [0, 1, 0])
+    )
+    barrel = affine(
+        unit_barrel,
+        lambda barrel_radius, barrel_length: (
+            np.array([barrel_length, barrel_radius, barrel_radius]), 0.0
+        ),
+        {"barrel_radius": barrel_radius, "barrel_length": barrel_length},
+    )
+    connector = affine(
+        trimesh.creation.cylinder(
+            radius=1.0, height=1.0, sections=sections_for(connector_radius, lod, 48)
+        ),
+        lambda connector_radius, connector_length: (
+            np.array([connector_radius, connector_radius, connector_length]),
+            np.array([0.0, 0.0, connector_length / 2]),
+        ),
+        {"connector_radius": connector_radius, "connector_length": connector_length},
+    )
+    return combined([barrel, connector])
 
-# Rotate saddle to match barrel
-outer.apply_transform(
-    trimesh.transformations.rotation_matrix(np.pi / 2, [0, 1, 0])
-)
-inner.apply_transform(
-    trimesh.transformations.rotation_matrix(np.pi / 2, [0, 1, 0])
-)
+def saddle_template(
+    barrel_radius=barrel_radius,
+    clearance=clearance,
+    saddle_wall=saddle_wall,
+    saddle_width=saddle_width,
+    lod=None,
+):
+    """build_saddle() whose radii and width update in place"""
+    sections = sections_for(barrel_radius + clearance + saddle_wall, lod, 64)
 
-# Cut bottom half to create open cradle
-cut_box = trimesh.creation.box(
-    [outer_radius * 3, outer_radius * 3, outer_radius * 3]
-)
-cut_box.apply_translation([0, -outer_radius * 1.5, 0])
+    def profile(barrel_radius, clearance, saddle_wall, saddle_width):
+        inner_radius = barrel_radius + clearance
+        ring = annular_sector(
+            inner_radius, inner_radius + saddle_wall, -np.pi / 2, np.pi / 2, sections
+        )
+        return ring, saddle_width
 
-saddle = outer.difference(inner).difference(cut_box)
+    return extruded(
+        profile,
+        annular_sector_caps(sections, -np.pi / 2, np.pi / 2),
+        {
+            "barrel_radius": barrel_radius,
+            "clearance": clearance,
+            "saddle_wall": saddle_wall,
+            "saddle_width": saddle_width,
+        },
+        axis=0,
+        center=True,
+    )
 
 # ======================================================
-# ADD VERTICAL CONNECTOR TO SADDLE
+# CLEARANCE (CLOSED FORM)
 # ======================================================
+def faceted_clearance(barrel_radius=barrel_radius, clearance=clearance, saddle_wall=saddle_wall, lod=None):
+    """Closed-form gap and wall of the cradle as build_saddle() meshes it"""
+    sections = sections_for(barrel_radius + clearance + saddle_wall, lod, 64)
+    return hinge_clearance(barrel_radius, clearance, saddle_wall, sections=sections)
 
-saddle_part = saddle
+def print_clearance(barrel_radius=barrel_radius, clearance=clearance, saddle_wall=saddle_wall, lod=None):
+    """Gap and wall straight from the parameters"""
+    fit = faceted_clearance(barrel_radius, clearance, saddle_wall, lod)
+    print(f"Barrel gap (faceted): {fit.gap:.3f} mm")
+    print(f"Cradle wall (faceted): {fit.wall_thickness:.3f} mm")
 
 # ======================================================
 # EXPORT FOR PRINTING
 # ======================================================
-barrel_part.export("elbow_hinge_barrel.obj")
-saddle_part.export("elbow_hinge_saddle.obj")
+def export_meshes(barrel_part, saddle_part):
+    """Write both printable parts to the working directory"""
+    barrel_part.export("elbow_hinge_barrel.obj")
+    saddle_part.export("elbow_hinge_saddle.obj")
 
-print("✅ Exported:")
-print(" - elbow_hinge_barrel.obj")
-print(" - elbow_hinge_saddle.obj")
+    print("✅ Exported:")
+    print(" - elbow_hinge_barrel.obj")
+    print(" - elbow_hinge_saddle.obj")
 
 # ======================================================
 # POLYSCOPE VISUALIZATION
 # ======================================================
-ps.init()
-
 class ElbowHingeAnimator:
-    def __init__(self, fixed, moving):
+    def __init__(self, fixed, moving, sdf=None, max_angle_deg=max_angle_deg):
+        import polyscope as ps
+
         self.fixed = fixed
+        self.sdf = sdf
         self.moving0 = moving
-        self.moving = moving.copy()
+        self.moving = PosedMesh(moving)  # reused output buffer
+        self.transform = np.eye(4)
         self.frame = 0
         self.angles = np.linspace(
             -max_angle_deg / 2,
@@ -110,19 +212,8 @@ class ElbowHingeAnimator:
             160
         )
 
-    def step(self):
-        self.moving = self.moving0.copy()
-        angle = self.angles[self.frame % len(self.angles)]
-
-        R = trimesh.transformations.rotation_matrix(
-            np.radians(angle),
-            [1, 0, 0],   # hinge axis
-            point=[0, 0, 0]
-        )
-
-        self.moving.apply_transform(R)
-
-        ps.register_surface_mesh(
+        # Register once; frames only push the barrel's 4x4 transform
+        self.saddle_mesh = ps.register_surface_mesh(
             "saddle",
             self.fixed.vertices,
             self.fixed.faces,
@@ -130,19 +221,130 @@ class ElbowHingeAnimator:
             transparency=0.55
         )
 
-        ps.register_surface_mesh(
+        self.barrel_mesh = ps.register_surface_mesh(
             "barrel",
-            self.moving.vertices,
-            self.moving.faces,
+            self.moving0.vertices,
+            self.moving0.faces,
             color=(0.8, 0.8, 0.8),
             transparency=0.35
         )
 
+    def step(self):
+        angle = self.angles[self.frame % len(self.angles)]
+
+        self.transform = trimesh.transformations.rotation_matrix(
+            np.radians(angle),
+            [1, 0, 0],   # hinge axis
+            point=[0, 0, 0]
+        )
+
+        self.barrel_mesh.set_transform(self.transform)
+
+        # Per-vertex clearance from the baked SDF (negative = collision)
+        if self.sdf is not None:
+            vertices = self.moving.apply(self.transform)
+            self.barrel_mesh.add_scalar_quantity(
+                "clearance",
+                self.sdf(vertices),
+                enabled=True,
+                cmap="coolwarm"
+            )
+
         self.frame += 1
 
-anim = ElbowHingeAnimator(saddle_part, barrel_part)
-ps.set_user_callback(anim.step)
+# ======================================================
+# SWEEP VARIANT (see sweep.py)
+# ======================================================
+def evaluate(
+    barrel_radius=barrel_radius,
+    barrel_length=barrel_length,
+    saddle_wall=saddle_wall,
+    saddle_width=saddle_width,
+    clearance=clearance,
+    connector_radius=connector_radius,
+    connector_length=connector_length,
+    lod=view_lod,
+    method="profile",
+    export_dir=None,
+    cache=None,
+):
+    """
+    Build and check one design, exporting it if export_dir is given
+    method="csg" reuses booleans through `cache` (default: the on-disk CSGCache).
+    """
+    cache = cache_for(method) if cache is None else cache
+    barrel = build_barrel(barrel_radius, barrel_length, connector_radius, connector_length, lod=lod)
+    saddle = build_saddle(barrel_radius, clearance, saddle_wall, saddle_width,
+                          lod=lod, method=method, cache=cache)
+
+    analytic = faceted_clearance(barrel_radius, clearance, saddle_wall, lod)
+
+    if export_dir is not None:
+        os.makedirs(export_dir, exist_ok=True)
+        build_barrel(barrel_radius, barrel_length, connector_radius, connector_length,
+                     lod=export_lod).export(os.path.join(export_dir, "elbow_hinge_barrel.obj"))
+        build_saddle(barrel_radius, clearance, saddle_wall, saddle_width,
+                     lod=export_lod, method=method, cache=cache).export(
+            os.path.join(export_dir, "elbow_hinge_saddle.obj"))
+
+    return {
+        "gap": analytic.gap,
+        "wall_thickness": analytic.wall_thickness,
+        "min_distance": minimum_distance(barrel, saddle).distance,
+    }
+
+# ======================================================
+# DEPENDENCY GRAPH (INCREMENTAL REBUILD)
+# ======================================================
+def design_graph(lod=view_lod, **overrides):
+    """
+    Parameter -> part graph of this joint (see design_graph.py)
+    e.g. changing `saddle_wall` rebuilds the saddle and its analyses, never the barrel.
+    """
+    graph = DesignGraph(
+        barrel_radius=barrel_radius,
+        barrel_length=barrel_length,
+        saddle_wall=saddle_wall,
+        saddle_width=saddle_width,
+        clearance=clearance,
+        connector_radius=connector_radius,
+        connector_length=connector_length,
+        lod=lod,
+    )
+    graph.set(**overrides)
+
+    graph.add("barrel", build_barrel,
+              ["barrel_radius", "barrel_length", "connector_radius", "connector_length", "lod"])
+    graph.add("saddle", build_saddle,
+              ["barrel_radius", "clearance", "saddle_wall", "saddle_width", "lod"])
+    graph.add("analytic", faceted_clearance, ["barrel_radius", "clearance", "saddle_wall", "lod"])
+    graph.add("min_distance", lambda barrel, saddle: minimum_distance(barrel, saddle).distance,
+              inputs=["barrel", "saddle"])
+    graph.add("sdf", lambda saddle: SignedDistanceField(saddle), inputs=["saddle"])
+    return graph
+
+def main(method=build_method):
+    """Build and export the hinge, then open the viewer"""
+    import polyscope as ps
+
+    # Coarse LOD for the viewer and SDF, fine LOD for what gets printed
+    cache = cache_for(method)
+    barrel_part = build_barrel(lod=view_lod)
+    saddle_part = build_saddle(lod=view_lod, method=method, cache=cache)
+
+    print_clearance(lod=export_lod)
+    export_meshes(build_barrel(lod=export_lod), build_saddle(lod=export_lod, method=method, cache=cache))
+
+    ps.init()
+
+    saddle_sdf = SignedDistanceField(saddle_part) if highlight_collisions else None
+    anim = ElbowHingeAnimator(saddle_part, barrel_part, sdf=saddle_sdf)
+    ps.set_user_callback(anim.step)
+
+    print("\n🎮 Elbow Hinge Joint")
+    print(f"Rotation range: ±{max_angle_deg / 2}°")
+    ps.show()
+
 
-print("\n🎮 Elbow Hinge Joint")
-print(f"Rotation range: ±{max_angle_deg / 2}°")
-ps.show()
+if __name__ == "__main__":
+    main()
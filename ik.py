@@ -0,0 +1,99 @@
+from collections import namedtuple
+
+import numpy as np
+
+# ========================================
+# BATCHED INVERSE KINEMATICS (DAMPED LEAST SQUARES)
+# ========================================
+# Moves a point fixed to one link of a KinematicTree onto target
+# positions, for many targets at once. Each iteration takes one batched
+# Jacobian pass over the targets still unsolved and steps
+#
+#   dq = J^T (J J^T + damping^2 I)^-1 (target - position)
+#
+# then clips q to the DOF limits. A DOF that sits on a limit and would be
+# pushed further out is frozen for that step, so the remaining joints
+# take over instead of the solve stalling against the stop. The damping
+# adapts per target (halved after a step that helped, quadrupled and the
+# step discarded otherwise). Pass the previous solution as `q0` to warm
+# start along a trajectory.
+IKResult = namedtuple("IKResult", ["q", "position", "error", "converged", "iterations"])
+
+min_damping = 1e-3
+max_damping = 1e3  # a target still not improving here has hit a stop or local minimum
+
+
+def initial_guess(tree):
+    """Mid-range of every limited DOF, zero where a side is unlimited"""
+    mid = (tree.lower + tree.upper) / 2
+    return np.where(np.isfinite(mid), mid, 0.0)
+
+
+def _step(J, error, damping):
+    """Batched DLS update for (N, 3, dof) Jacobians, (N, 3) errors and (N,) damping"""
+    JJt = J @ J.transpose(0, 2, 1)
+    JJt[:, [0, 1, 2], [0, 1, 2]] += damping[:, None] ** 2
+    return (J.transpose(0, 2, 1) @ np.linalg.solve(JJt, error[..., None]))[..., 0]
+
+
+def solve(
+    tree,
+    link,
+    targets,
+    point=(0, 0, 0),
+    q0=None,
+    damping=0.1,
+    tolerance=1e-3,
+    max_iterations=100,
+):
+    """
+    Joint values placing `point` (in `link`'s frame) at each target
+    targets is (N, 3) in mm; q0 is (dof,) or (N, dof), default
+    initial_guess(tree). `damping` (mm) is the starting damping of every
+    target. Unreachable targets return the closest configuration found
+    with converged=False.
+    """
+    targets = np.atleast_2d(np.asarray(targets, dtype=np.float64))
+    n = len(targets)
+    q = np.empty((n, len(tree.dofs)))
+    q[...] = initial_guess(tree) if q0 is None else q0
+    np.clip(q, tree.lower, tree.upper, out=q)
+
+    jac = tree.jacobian(q, link, point)
+    position, J = jac.position, jac.matrix[:, :3]
+    error = targets - position
+    norm = np.linalg.norm(error, axis=1)
+    lam = np.full(n, float(damping))
+    iterations = np.zeros(n, dtype=np.int64)
+
+    active = np.flatnonzero(norm > tolerance)
+    for _ in range(max_iterations):
+        if not len(active):
+            break
+        Ja, ea, qa = J[active], error[active], q[active]
+        dq = _step(Ja, ea, lam[active])
+        blocked = ((qa <= tree.lower) & (dq < 0)) | ((qa >= tree.upper) & (dq > 0))
+        if blocked.any():
+            rows = blocked.any(axis=1)
+            dq[rows] = _step(np.where(blocked[rows, None, :], 0.0, Ja[rows]), ea[rows], lam[active][rows])
+        trial = np.clip(qa + dq, tree.lower, tree.upper)
+
+        # Levenberg-Marquardt style: keep a step that reduced the error and
+        # relax the damping, otherwise stay put and damp harder
+        jac = tree.jacobian(trial, link, point)
+        trial_error = targets[active] - jac.position
+        trial_norm = np.linalg.norm(trial_error, axis=1)
+        better = trial_norm < norm[active]
+        kept = active[better]
+        q[kept] = trial[better]
+        position[kept] = jac.position[better]
+        J[kept] = jac.matrix[better, :3]
+        error[kept] = trial_error[better]
+        norm[kept] = trial_norm[better]
+        lam[kept] = np.maximum(lam[kept] / 2, min_damping)
+        lam[active[~better]] *= 4
+        iterations[active] += 1
+
+        active = active[(norm[active] > tolerance) & (lam[active] <= max_damping)]
+
+    return IKResult(q, position, norm, norm <= tolerance, iterations)
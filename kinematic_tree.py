@@ -0,0 +1,234 @@
+from collections import namedtuple
+
+import numpy as np
+
+from kinematics import motion
+
+# ========================================
+# KINEMATIC TREE
+# ========================================
+# Links form a tree. Every link except the root hangs off its parent
+# through one joint: a fixed `origin` (parent link frame -> joint frame)
+# followed by zero or more typed one-DOF motions, each with limits; a
+# joint without DOFs is rigid. Joint values live in one (dof,) array and
+# world transforms in one contiguous (links, 4, 4) array, both in the
+# order links were added (parents before children). Setting a value only
+# marks its link dirty; `update()` recomputes dirty links and their
+# subtrees, so moving a finger joint never touches the arm above it.
+#
+#   tree.set(hinge=30.0)
+#   tree.transform("carriage")    # recomputes hinge_moving and carriage only
+Dof = namedtuple("Dof", ["name", "kind", "axis", "lower", "upper"])
+Link = namedtuple("Link", ["name", "mesh", "parent", "origin", "dofs"])  # parent index, slice of q
+Jacobian = namedtuple("Jacobian", ["position", "frame", "matrix"])
+
+
+def _dof(name, kind, axis, lower, upper):
+    axis = np.asarray(axis, dtype=np.float64)
+    if lower > upper:
+        raise ValueError(f"{name}: lower limit {lower} above upper limit {upper}")
+    return Dof(name, kind, axis / np.linalg.norm(axis), float(lower), float(upper))
+
+
+def rotational(name, axis, lower=-np.inf, upper=np.inf):
+    """Rotation about a local axis, limits in degrees"""
+    return _dof(name, "revolute", axis, lower, upper)
+
+
+def translational(name, axis, lower=-np.inf, upper=np.inf):
+    """Translation along a local axis, limits in mm"""
+    return _dof(name, "prismatic", axis, lower, upper)
+
+
+class KinematicTree:
+    def __init__(self):
+        self.links = []                  # Link, parents before children
+        self.index = {}                  # link name -> index
+        self.dofs = []                   # Dof, grouped by link in link order
+        self.dof_index = {}              # dof name -> index into q
+        self.dof_link = []               # dof index -> index of the link it moves
+        self.q = np.zeros(0)
+        self.lower = np.zeros(0)
+        self.upper = np.zeros(0)
+        self.world = np.zeros((0, 4, 4))
+        self.dirty = np.zeros(0, dtype=bool)
+        self.updates = 0                 # links recomputed so far
+
+    def add_link(self, name, mesh=None, parent=None, origin=None, dofs=()):
+        """
+        Attach link `name` to `parent` (None for the root)
+        `origin` places the joint in the parent frame (the parent's child
+        frame); `dofs` are applied in order after it, starting at zero or
+        the nearest limit.
+        """
+        if name in self.index:
+            raise ValueError(f"link {name!r} already exists")
+        if parent is None and self.links:
+            raise ValueError(f"link {name!r} needs a parent; the tree already has a root")
+        if parent is not None and parent not in self.index:
+            raise KeyError(f"parent {parent!r} of {name!r} is not defined yet")
+        for dof in dofs:
+            if dof.name in self.dof_index:
+                raise ValueError(f"dof {dof.name!r} already exists")
+
+        start = len(self.dofs)
+        for dof in dofs:
+            self.dof_index[dof.name] = len(self.dofs)
+            self.dofs.append(dof)
+            self.dof_link.append(len(self.links))
+        origin = np.eye(4) if origin is None else np.asarray(origin, dtype=np.float64)
+        parent_index = -1 if parent is None else self.index[parent]
+
+        self.index[name] = len(self.links)
+        self.links.append(Link(name, mesh, parent_index, origin, slice(start, len(self.dofs))))
+
+        # Grow the flat arrays; this only happens while building the tree
+        lower = np.array([d.lower for d in dofs])
+        upper = np.array([d.upper for d in dofs])
+        self.lower = np.concatenate([self.lower, lower])
+        self.upper = np.concatenate([self.upper, upper])
+        self.q = np.concatenate([self.q, np.clip(np.zeros(len(dofs)), lower, upper)])
+        self.world = np.concatenate([self.world, np.eye(4)[None]])
+        self.dirty = np.append(self.dirty, True)
+        return self
+
+    @property
+    def dof_names(self):
+        return [dof.name for dof in self.dofs]
+
+    def set(self, **values):
+        """Set joint values by DOF name (clipped to limits); marks their links dirty"""
+        for name, value in values.items():
+            j = self.dof_index[name]
+            value = min(max(float(value), self.lower[j]), self.upper[j])
+            if value != self.q[j]:
+                self.q[j] = value
+                self.dirty[self.dof_link[j]] = True
+        return self
+
+    def set_q(self, q):
+        """Set every joint value at once (clipped to limits)"""
+        q = np.clip(np.asarray(q, dtype=np.float64), self.lower, self.upper)
+        for i, link in enumerate(self.links):
+            if not np.array_equal(self.q[link.dofs], q[link.dofs]):
+                self.dirty[i] = True
+        self.q[...] = q
+        return self
+
+    def subtree(self, name):
+        """Indices of link `name` and all its descendants"""
+        found = {self.index[name]}
+        for i, link in enumerate(self.links):
+            if link.parent in found:
+                found.add(i)
+        return sorted(found)
+
+    def local(self, i, q=None):
+        """Parent frame -> link frame of link `i` at joint values `q` (default: current)"""
+        link = self.links[i]
+        q = self.q if q is None else q
+        transform = link.origin
+        for dof, value in zip(self.dofs[link.dofs], q[link.dofs]):
+            transform = transform @ motion(dof, value)
+        return transform
+
+    def update(self):
+        """Recompute dirty links and everything below them; returns the indices updated"""
+        if not self.dirty.any():
+            return []
+        updated = []
+        for i, link in enumerate(self.links):
+            # Parents come first, so a dirty parent has already been redone
+            if link.parent >= 0 and self.dirty[link.parent]:
+                self.dirty[i] = True
+            if self.dirty[i]:
+                local = self.local(i)
+                self.world[i] = local if link.parent < 0 else self.world[link.parent] @ local
+                updated.append(i)
+        self.dirty[:] = False
+        self.updates += len(updated)
+        return updated
+
+    def transform(self, name):
+        """Current world transform of a link"""
+        self.update()
+        return self.world[self.index[name]]
+
+    def forward(self, q, dof_frames=False):
+        """
+        World transforms of every link for a batch of configurations
+        q is (N, dof) or (dof,); returns (N, links, 4, 4) or (links, 4, 4).
+        Values are used as given, without clipping to the limits.
+        dof_frames=True also returns the world frame after each DOF's
+        motion, (N, dof, 4, 4) or (dof, 4, 4).
+        """
+        q = np.asarray(q, dtype=np.float64)
+        single = q.ndim == 1
+        q = np.atleast_2d(q)
+        if q.shape[1] != len(self.dofs):
+            raise ValueError(f"expected {len(self.dofs)} joint values, got {q.shape[1]}")
+
+        world = np.empty((len(q), len(self.links), 4, 4))
+        frames = np.empty((len(q), len(self.dofs), 4, 4)) if dof_frames else None
+        for i, link in enumerate(self.links):
+            if link.parent < 0:
+                frame = link.origin
+            elif np.array_equal(link.origin, np.eye(4)):
+                frame = world[:, link.parent]
+            else:
+                frame = world[:, link.parent] @ link.origin
+            for j in range(link.dofs.start, link.dofs.stop):
+                frame = frame @ motion(self.dofs[j], q[:, j])
+                if dof_frames:
+                    frames[:, j] = frame
+            world[:, i] = frame
+
+        if single:
+            world = world[0]
+            frames = None if frames is None else frames[0]
+        return (world, frames) if dof_frames else world
+
+    def ancestors(self, name):
+        """Indices of the links from the root down to link `name`"""
+        path = [self.index[name]]
+        while self.links[path[-1]].parent >= 0:
+            path.append(self.links[path[-1]].parent)
+        return path[::-1]
+
+    def jacobian(self, q, link, point=(0, 0, 0)):
+        """
+        Geometric Jacobian of a point fixed to `link`, batched over configurations
+        Built from the joint axes of the FK frames, so it costs one FK pass.
+        Returns Jacobian(position (N, 3), frame (N, 4, 4), matrix (N, 6, dof)):
+        rows are the point's linear velocity then the link's angular velocity
+        per unit joint value (degree or mm); DOFs off the path to the root
+        have zero columns.
+        """
+        q = np.asarray(q, dtype=np.float64)
+        single = q.ndim == 1
+        q = np.atleast_2d(q)
+        world, frames = self.forward(q, dof_frames=True)
+        frame = world[:, self.index[link]]
+        position = frame[:, :3, :3] @ np.asarray(point, dtype=np.float64) + frame[:, :3, 3]
+
+        J = np.zeros((len(q), 6, len(self.dofs)))
+        for i in self.ancestors(link):
+            span = self.links[i].dofs
+            if span.start == span.stop:
+                continue
+            dofs = self.dofs[span]
+            # Motion axes in world space; a rotation about its own axis, or a
+            # translation, leaves the axis where it was before the motion
+            axes = np.stack([dof.axis for dof in dofs])                       # (k, 3)
+            world_axes = np.einsum("nkij,kj->nki", frames[:, span, :3, :3], axes)
+            revolute = np.array([dof.kind == "revolute" for dof in dofs])
+
+            lever = position[:, None] - frames[:, span, :3, 3]
+            linear = np.where(revolute[:, None], np.cross(world_axes, lever) * np.radians(1), world_axes)
+            angular = np.where(revolute[:, None], world_axes * np.radians(1), 0.0)
+            J[:, :3, span] = linear.transpose(0, 2, 1)
+            J[:, 3:, span] = angular.transpose(0, 2, 1)
+
+        if single:
+            return Jacobian(position[0], frame[0], J[0])
+        return Jacobian(position, frame, J)
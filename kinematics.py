@@ -0,0 +1,45 @@
+import numpy as np
+
+# ========================================
+# STACKED JOINT MOTIONS
+# ========================================
+# Stacked 4x4 motions of one-DOF joints: a rotation about, or a
+# translation along, a local unit `axis`. Joint values come in as arrays
+# (degrees for revolute joints, mm for prismatic ones) and one call
+# builds the transform of every configuration, so a million poses cost a
+# handful of array operations instead of a million Python-level matrix
+# products. kinematic_tree.KinematicTree.forward chains them per link.
+
+
+def rotations(angles, axis):
+    """
+    Stacked rotations by `angles` (degrees) about one unit axis
+    Rodrigues' formula written out element-wise; returns (..., 4, 4)
+    """
+    angles = np.radians(np.asarray(angles, dtype=np.float64))
+    c, s = np.cos(angles)[..., None, None], np.sin(angles)[..., None, None]
+    x, y, z = axis
+    K = np.array([[0, -z, y], [z, 0, -x], [-y, x, 0]])
+
+    M = np.zeros(angles.shape + (4, 4))
+    M[..., :3, :3] = c * np.eye(3) + s * K + (1 - c) * np.outer(axis, axis)
+    M[..., 3, 3] = 1.0
+    return M
+
+
+def translations(offsets, axis):
+    """Stacked translations by `offsets` along one unit axis; returns (..., 4, 4)"""
+    offsets = np.asarray(offsets, dtype=np.float64)
+    M = np.zeros(offsets.shape + (4, 4))
+    M[..., [0, 1, 2, 3], [0, 1, 2, 3]] = 1.0
+    M[..., :3, 3] = offsets[..., None] * axis
+    return M
+
+
+def motion(dof, values):
+    """Local transforms of one DOF (anything with .kind and .axis) for an array of values"""
+    if dof.kind == "revolute":
+        return rotations(values, dof.axis)
+    if dof.kind == "prismatic":
+        return translations(values, dof.axis)
+    raise ValueError(f"unknown joint kind {dof.kind!r}")
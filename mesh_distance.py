@@ -0,0 +1,405 @@
+from collections import namedtuple
+
+import numpy as np
+import trimesh
+from scipy.spatial import cKDTree
+
+# ========================================
+# SAMPLED MINIMUM DISTANCE (KD-TREE)
+# ========================================
+def check_minimum_distance(mesh1, mesh2, num_samples=1000):
+    """
+    Estimate minimum distance between two meshes using point sampling
+    A KD-tree is built once over the mesh2 samples and queried for every
+    mesh1 sample in one vectorized batch.
+    Returns minimum distance found
+    """
+    # Sample points on both surfaces
+    points1 = mesh1.sample(num_samples)
+    points2 = mesh2.sample(num_samples)
+
+    tree = cKDTree(points2)
+
+    # A coarse pass gives an upper bound so the full query can prune
+    # every branch farther away than the best distance seen so far
+    coarse, _ = tree.query(points1[::max(1, len(points1) // 1000)], k=1)
+    bound = np.nextafter(coarse.min(), np.inf)
+
+    # For each point on mesh1, find closest point on mesh2
+    distances, _ = tree.query(points1, k=1, distance_upper_bound=bound, workers=-1)
+
+    return float(np.min(distances))
+
+
+# ========================================
+# EXACT MINIMUM DISTANCE (TRIANGLE BVH)
+# ========================================
+MinimumDistance = namedtuple(
+    "MinimumDistance", ["distance", "point1", "point2", "face1", "face2"]
+)
+
+
+class TriangleBVH:
+    """Axis-aligned bounding volume hierarchy over the faces of a mesh"""
+
+    def __init__(self, mesh, leaf_size=8):
+        triangles = np.asarray(mesh.triangles, dtype=np.float64)
+        centroids = triangles.mean(axis=1)
+        tri_min = triangles.min(axis=1)
+        tri_max = triangles.max(axis=1)
+
+        order = np.arange(len(triangles))
+        bounds_min, bounds_max, children, spans = [], [], [], []
+
+        # Median split along the widest centroid axis, built depth-first
+        def build(start, stop):
+            index = len(bounds_min)
+            faces = order[start:stop]
+            bounds_min.append(tri_min[faces].min(axis=0))
+            bounds_max.append(tri_max[faces].max(axis=0))
+            children.append((-1, -1))
+            spans.append((start, stop))
+            if stop - start > leaf_size:
+                extent = np.ptp(centroids[faces], axis=0)
+                axis = int(np.argmax(extent))
+                middle = (stop - start) // 2
+                split = np.argpartition(centroids[faces, axis], middle)
+                order[start:stop] = faces[split]
+                left = build(start, start + middle)
+                right = build(start + middle, stop)
+                children[index] = (left, right)
+            return index
+
+        build(0, len(triangles))
+
+        self.bounds_min = np.array(bounds_min)
+        self.bounds_max = np.array(bounds_max)
+        self.children = np.array(children, dtype=np.int64)
+        self.spans = np.array(spans, dtype=np.int64)
+        self.faces = order
+        self.leaf_size = leaf_size
+        self.triangles = triangles[order]
+        self.triangles_min = tri_min[order]
+        self.triangles_max = tri_max[order]
+
+    def size(self, nodes):
+        return np.prod(self.bounds_max[nodes] - self.bounds_min[nodes], axis=-1)
+
+
+def _box_distances(bvh1, a, bvh2, b):
+    """Lower bound on the distance between node boxes a[i] and b[i]"""
+    gap = np.maximum(
+        0.0,
+        np.maximum(bvh1.bounds_min[a] - bvh2.bounds_max[b],
+                   bvh2.bounds_min[b] - bvh1.bounds_max[a]),
+    )
+    return np.sqrt(np.einsum("ij,ij->i", gap, gap))
+
+
+def _leaf_triangle_pairs(bvh1, a, bvh2, b):
+    """All (triangle, triangle) index pairs for leaf node pairs a[i], b[i]"""
+    sa, ea = bvh1.spans[a].T
+    sb, eb = bvh2.spans[b].T
+    ia = sa[:, None, None] + np.arange(bvh1.leaf_size)[None, :, None]
+    ib = sb[:, None, None] + np.arange(bvh2.leaf_size)[None, None, :]
+    ia, ib = np.broadcast_arrays(ia, ib)
+    mask = (ia < ea[:, None, None]) & (ib < eb[:, None, None])
+    return ia[mask], ib[mask]
+
+
+def _segment_segment(p1, q1, p2, q2):
+    """Closest points between batches of segments p1-q1 and p2-q2"""
+    d1 = q1 - p1
+    d2 = q2 - p2
+    r = p1 - p2
+    a = np.maximum(np.einsum("ij,ij->i", d1, d1), 1e-300)
+    e = np.maximum(np.einsum("ij,ij->i", d2, d2), 1e-300)
+    b = np.einsum("ij,ij->i", d1, d2)
+    c = np.einsum("ij,ij->i", d1, r)
+    f = np.einsum("ij,ij->i", d2, r)
+
+    # Parallel segments fall back to s = 0
+    denom = a * e - b * b
+    parallel = denom <= 1e-12 * a * e
+    s = (b * f - c * e) / np.where(parallel, 1.0, denom)
+    s = np.where(parallel, 0.0, np.clip(s, 0.0, 1.0))
+    t = (b * s + f) / e
+
+    low = t < 0.0
+    high = t > 1.0
+    s = np.where(low, np.clip(-c / a, 0.0, 1.0), s)
+    s = np.where(high, np.clip((b - c) / a, 0.0, 1.0), s)
+    t = np.clip(t, 0.0, 1.0)
+
+    return p1 + d1 * s[:, None], p2 + d2 * t[:, None]
+
+
+def _segment_triangle(p, q, triangles):
+    """Moller-Trumbore test of segments p-q against triangles"""
+    direction = q - p
+    e1 = triangles[:, 1] - triangles[:, 0]
+    e2 = triangles[:, 2] - triangles[:, 0]
+    h = np.cross(direction, e2)
+    a = np.einsum("ij,ij->i", e1, h)
+    valid = np.abs(a) > 1e-12
+    inv = 1.0 / np.where(valid, a, 1.0)
+    s = p - triangles[:, 0]
+    u = inv * np.einsum("ij,ij->i", s, h)
+    qv = np.cross(s, e1)
+    v = inv * np.einsum("ij,ij->i", direction, qv)
+    t = inv * np.einsum("ij,ij->i", e2, qv)
+    hit = valid & (u >= 0) & (v >= 0) & (u + v <= 1) & (t >= 0) & (t <= 1)
+    return hit, p + direction * t[:, None]
+
+
+def triangle_distances(tri1, tri2):
+    """
+    Exact distance between paired triangles tri1[i] and tri2[i]
+    Returns distances and the closest point on each triangle
+    """
+    n = len(tri1)
+    edges = [(0, 1), (1, 2), (2, 0)]
+
+    # Edge-edge candidates (9 per pair)
+    i1 = np.repeat([e[0] for e in edges], 3)
+    j1 = np.repeat([e[1] for e in edges], 3)
+    i2 = np.tile([e[0] for e in edges], 3)
+    j2 = np.tile([e[1] for e in edges], 3)
+    c1, c2 = _segment_segment(
+        tri1[:, i1].reshape(-1, 3), tri1[:, j1].reshape(-1, 3),
+        tri2[:, i2].reshape(-1, 3), tri2[:, j2].reshape(-1, 3),
+    )
+    cand1 = [c1.reshape(n, 9, 3)]
+    cand2 = [c2.reshape(n, 9, 3)]
+
+    # Vertex-triangle candidates (3 per side)
+    v1 = tri1.reshape(-1, 3)
+    on2 = trimesh.triangles.closest_point(np.repeat(tri2, 3, axis=0), v1)
+    v2 = tri2.reshape(-1, 3)
+    on1 = trimesh.triangles.closest_point(np.repeat(tri1, 3, axis=0), v2)
+    cand1 += [v1.reshape(n, 3, 3), on1.reshape(n, 3, 3)]
+    cand2 += [on2.reshape(n, 3, 3), v2.reshape(n, 3, 3)]
+
+    cand1 = np.concatenate(cand1, axis=1)
+    cand2 = np.concatenate(cand2, axis=1)
+    dist = np.linalg.norm(cand1 - cand2, axis=2)
+    best = np.argmin(dist, axis=1)
+    rows = np.arange(n)
+    distances = dist[rows, best]
+    point1 = cand1[rows, best]
+    point2 = cand2[rows, best]
+
+    # Crossing triangles have zero distance even if no candidate says so
+    for a, b in ((tri1, tri2), (tri2, tri1)):
+        for i, j in edges:
+            hit, where = _segment_triangle(a[:, i], a[:, j], b)
+            hit &= distances > 0.0
+            distances[hit] = 0.0
+            point1[hit] = where[hit]
+            point2[hit] = where[hit]
+
+    return distances, point1, point2
+
+
+def minimum_distance(mesh1, mesh2, bvh1=None, bvh2=None, chunk_size=64):
+    """
+    Exact minimum distance between the surfaces of two meshes
+    Branch-and-bound over a pair of triangle BVHs; node pairs whose
+    bounding boxes are farther apart than the best distance are pruned.
+    Returns MinimumDistance(distance, point1, point2, face1, face2);
+    raises ValueError if either mesh has no faces.
+    """
+    if len(mesh1.faces) == 0 or len(mesh2.faces) == 0:
+        raise ValueError("minimum_distance needs two non-empty meshes")
+    bvh1 = TriangleBVH(mesh1) if bvh1 is None else bvh1
+    bvh2 = TriangleBVH(mesh2) if bvh2 is None else bvh2
+
+    # Closest pair of face vertices is a cheap upper bound to start pruning
+    # with, and the answer if no triangle pair beats it; vertices no face
+    # uses are not on the surface and must not tighten the bound
+    faces1, faces2 = np.asarray(mesh1.faces), np.asarray(mesh2.faces)
+    used1, used2 = np.unique(faces1), np.unique(faces2)
+    v1 = np.asarray(mesh1.vertices)[used1]
+    v2 = np.asarray(mesh2.vertices)[used2]
+    vertex_dist, nearest = cKDTree(v2).query(v1, k=1)
+    i = int(np.argmin(vertex_dist))
+    j = int(nearest[i])
+    best_distance = float(vertex_dist[i])
+    best = MinimumDistance(
+        best_distance, v1[i], v2[j],
+        int(np.nonzero(faces1 == used1[i])[0][0]),
+        int(np.nonzero(faces2 == used2[j])[0][0]),
+    )
+
+    # Breadth-first over node pairs, one vectorized level at a time
+    pairs = np.zeros((1, 2), dtype=np.int64)
+    leaf_pairs = []
+    while len(pairs):
+        a, b = pairs[:, 0], pairs[:, 1]
+        bound = _box_distances(bvh1, a, bvh2, b)
+        keep = bound <= best_distance
+        a, b = a[keep], b[keep]
+
+        leaf_a = bvh1.children[a, 0] < 0
+        leaf_b = bvh2.children[b, 0] < 0
+        both = leaf_a & leaf_b
+        leaf_pairs.append((a[both], b[both], bound[keep][both]))
+
+        # Descend into the larger node (or the only non-leaf)
+        split_a = ~both & (leaf_b | (~leaf_a & (bvh1.size(a) >= bvh2.size(b))))
+        split_b = ~both & ~split_a
+        pairs = np.concatenate([
+            np.column_stack([bvh1.children[a[split_a], 0], b[split_a]]),
+            np.column_stack([bvh1.children[a[split_a], 1], b[split_a]]),
+            np.column_stack([a[split_b], bvh2.children[b[split_b], 0]]),
+            np.column_stack([a[split_b], bvh2.children[b[split_b], 1]]),
+        ])
+
+    # Evaluate leaf pairs nearest-first, tightening the bound per chunk
+    leaf_a, leaf_b, leaf_bound = (np.concatenate(x) for x in zip(*leaf_pairs))
+    order = np.argsort(leaf_bound, kind="stable")
+    leaf_a, leaf_b, leaf_bound = leaf_a[order], leaf_b[order], leaf_bound[order]
+
+    for start in range(0, len(order), chunk_size):
+        chunk = slice(start, start + chunk_size)
+        live = leaf_bound[chunk] <= best_distance
+        if not live.any():
+            break
+        ia, ib = _leaf_triangle_pairs(bvh1, leaf_a[chunk][live], bvh2, leaf_b[chunk][live])
+
+        # Same box test per triangle pair before the exact evaluation
+        gap = np.maximum(
+            0.0,
+            np.maximum(bvh1.triangles_min[ia] - bvh2.triangles_max[ib],
+                       bvh2.triangles_min[ib] - bvh1.triangles_max[ia]),
+        )
+        near = np.einsum("ij,ij->i", gap, gap) <= best_distance ** 2
+        if not near.any():
+            continue
+        ia, ib = ia[near], ib[near]
+        dist, p1, p2 = triangle_distances(bvh1.triangles[ia], bvh2.triangles[ib])
+        k = int(np.argmin(dist))
+        if dist[k] < best_distance:
+            best_distance = float(dist[k])
+            best = MinimumDistance(
+                best_distance, p1[k], p2[k],
+                int(bvh1.faces[ia[k]]), int(bvh2.faces[ib[k]]),
+            )
+
+    return best
+
+
+# ========================================
+# INSIDE / OUTSIDE TEST (RAY PARITY)
+# ========================================
+# A fixed, generic rotation keeps the +Z rays off axis-aligned edges and
+# vertices of primitives, where crossings would be double counted
+_RAY_FRAME = trimesh.transformations.euler_matrix(0.0131, 0.0071, 0.0123)[:3, :3]
+
+
+def points_inside(mesh, points, chunk_size=50_000):
+    """
+    Vectorized inside test against a watertight mesh
+    Casts a ray from every point and counts crossings; triangles are
+    bucketed on a 2D grid so each point only tests its own column.
+    """
+    triangles = np.asarray(mesh.triangles) @ _RAY_FRAME.T
+    points = np.asarray(points, dtype=np.float64) @ _RAY_FRAME.T
+
+    # Bucket triangles by the grid cells their XY extent overlaps
+    low = triangles[:, :, :2].min(axis=1)
+    high = triangles[:, :, :2].max(axis=1)
+    origin = low.min(axis=0)
+    # Cells sized to the typical footprint keep only a few candidates per
+    # ray; slivers would otherwise drag the size up. Capped at 512^2 cells.
+    footprint = np.sqrt(np.prod(high - low, axis=1))
+    cell = max(0.5 * float(np.median(footprint)), float(np.ptp(low, axis=0).max()) / 512, 1e-9)
+    first = np.floor((low - origin) / cell).astype(np.int64)
+    last = np.floor((high - origin) / cell).astype(np.int64)
+    shape = last.max(axis=0) + 1
+
+    span = last - first + 1
+    count = span[:, 0] * span[:, 1]
+    tri = np.repeat(np.arange(len(triangles)), count)
+    local = np.arange(count.sum()) - np.repeat(np.cumsum(count) - count, count)
+    cx = first[tri, 0] + local % span[tri, 0]
+    cy = first[tri, 1] + local // span[tri, 0]
+    key = cx * shape[1] + cy
+    order = np.argsort(key, kind="stable")
+    bucket = tri[order]
+    start = np.searchsorted(key[order], np.arange(shape[0] * shape[1] + 1))
+
+    z_low = triangles[:, :, 2].min()
+    z_high = triangles[:, :, 2].max()
+
+    inside = np.zeros(len(points), dtype=bool)
+    for begin in range(0, len(points), chunk_size):
+        p = points[begin:begin + chunk_size]
+        pc = np.floor((p[:, :2] - origin) / cell).astype(np.int64)
+        valid = np.all((pc >= 0) & (pc < shape), axis=1)
+        valid &= (p[:, 2] >= z_low) & (p[:, 2] <= z_high)
+        index = np.nonzero(valid)[0]
+        key = pc[index, 0] * shape[1] + pc[index, 1]
+        n = start[key + 1] - start[key]
+
+        # One (point, triangle) pair per candidate in the point's cell
+        pi = np.repeat(index, n)
+        offset = np.arange(n.sum()) - np.repeat(np.cumsum(n) - n, n)
+        t = triangles[bucket[np.repeat(start[key], n) + offset]]
+
+        v0 = t[:, 1, :2] - t[:, 0, :2]
+        v1 = t[:, 2, :2] - t[:, 0, :2]
+        v2 = p[pi, :2] - t[:, 0, :2]
+        det = v0[:, 0] * v1[:, 1] - v1[:, 0] * v0[:, 1]
+        ok = np.abs(det) > 1e-300
+        det = np.where(ok, det, 1.0)
+        u = (v2[:, 0] * v1[:, 1] - v1[:, 0] * v2[:, 1]) / det
+        v = (v0[:, 0] * v2[:, 1] - v2[:, 0] * v0[:, 1]) / det
+        z = t[:, 0, 2] + u * (t[:, 1, 2] - t[:, 0, 2]) + v * (t[:, 2, 2] - t[:, 0, 2])
+        hit = ok & (u >= 0) & (v >= 0) & (u + v <= 1) & (z > p[pi, 2])
+
+        crossings = np.bincount(pi[hit], minlength=len(p))
+        inside[begin:begin + chunk_size] = crossings % 2 == 1
+
+    return inside
+
+
+# ========================================
+# SIGNED DISTANCE / PENETRATION DEPTH
+# ========================================
+Penetration = namedtuple(
+    "Penetration", ["signed_distance", "depth", "overlap_volume"]
+)
+
+
+def penetration(moving, fixed, num_samples=10_000, num_volume_samples=100_000, seed=None):
+    """
+    Signed distance between a moving part and a watertight fixed part
+    Positive = separated by that much, negative = penetrating that deep.
+    Depth is the deepest moving-surface point inside `fixed`; the overlap
+    volume is a Monte Carlo estimate over the shared bounding box.
+    """
+    rng = np.random.default_rng(seed)
+
+    # Query the vertices plus a uniform surface sample of the moving part
+    points = np.vstack([moving.vertices, moving.sample(num_samples, seed=seed)])
+    inside = points_inside(fixed, points)
+
+    if not inside.any():
+        distance = minimum_distance(moving, fixed).distance
+        return Penetration(distance, 0.0, 0.0)
+
+    _, depths, _ = trimesh.proximity.closest_point(fixed, points[inside])
+    depth = float(depths.max())
+
+    # Fraction of the shared box inside both parts
+    low = np.maximum(moving.bounds[0], fixed.bounds[0])
+    high = np.minimum(moving.bounds[1], fixed.bounds[1])
+    volume = 0.0
+    if np.all(high > low):
+        samples = rng.uniform(low, high, size=(num_volume_samples, 3))
+        both = points_inside(fixed, samples)
+        both[both] = points_inside(moving, samples[both])
+        volume = float(np.prod(high - low) * both.mean())
+
+    return Penetration(-depth, depth, volume)
@@ -0,0 +1,26 @@
+import numpy as np
+
+# ========================================
+# POSED MESH VIEW (PREALLOCATED BUFFERS)
+# ========================================
+class PosedMesh:
+    """
+    Rigidly posed view of a rest mesh without per-frame allocation
+    Rest vertices are kept as one contiguous float array and every pose is
+    written into the same output buffer; faces are shared with the rest mesh.
+    """
+
+    output_buffers = ("vertices",)  # private per process when shared (shared_parts.py)
+
+    def __init__(self, mesh):
+        self.rest = np.ascontiguousarray(mesh.vertices, dtype=np.float64)
+        self.faces = mesh.faces
+        self.vertices = self.rest.copy()
+        self.transform = np.eye(4)
+
+    def apply(self, transform):
+        """Write R @ v + t for every rest vertex into the output buffer"""
+        self.transform = transform
+        np.matmul(self.rest, transform[:3, :3].T, out=self.vertices)
+        self.vertices += transform[:3, 3]
+        return self.vertices
@@ -0,0 +1,201 @@
+import numpy as np
+import trimesh
+
+# ========================================
+# PROFILE REVOLVE / EXTRUDE KERNEL
+# ========================================
+# Joint parts are surfaces of revolution or straight extrusions of a
+# closed 2D profile, so they can be meshed directly instead of being
+# assembled from primitives and booleans. Profiles are (N, 2) polylines,
+# implicitly closed, built from `arc` and straight segments. Output is a
+# watertight, consistently wound trimesh; the same inputs always give
+# the same vertices and faces.
+
+def arc_steps(start, stop, sections):
+    """Segments needed so no arc step exceeds 2 * pi / sections"""
+    return max(1, int(np.ceil(abs(stop - start) / (2 * np.pi / sections) - 1e-9)))
+
+
+def arc(radius, start, stop, sections, center=(0.0, 0.0), steps=None):
+    """
+    Points on a circular arc from angle start to stop (radians)
+    The step never exceeds 2 * pi / sections unless `steps` fixes the
+    segment count; endpoints are included.
+    """
+    if steps is None:
+        steps = arc_steps(start, stop, sections)
+    angle = np.linspace(start, stop, steps + 1)
+    return np.column_stack([
+        center[0] + radius * np.cos(angle),
+        center[1] + radius * np.sin(angle),
+    ])
+
+
+def rectangle(x0, y0, x1, y1):
+    """Axis-aligned rectangle profile"""
+    return np.array([[x0, y0], [x1, y0], [x1, y1], [x0, y1]], dtype=np.float64)
+
+
+def annular_sector(inner_radius, outer_radius, start, stop, sections):
+    """Ring segment between two radii, outer arc out and inner arc back"""
+    return np.vstack([
+        arc(outer_radius, start, stop, sections),
+        arc(inner_radius, stop, start, sections),
+    ])
+
+
+def annular_sector_caps(sections, start, stop):
+    """
+    Strip triangulation of `annular_sector(..., start, stop, sections)`
+    Valid for any radii, so it survives parameter changes.
+    """
+    steps = arc_steps(start, stop, sections)
+    k = np.arange(steps)
+    outer = lambda i: i
+    inner = lambda i: 2 * steps + 1 - i
+    return np.vstack([
+        np.column_stack([outer(k), outer(k + 1), inner(k + 1)]),
+        np.column_stack([outer(k), inner(k + 1), inner(k)]),
+    ])
+
+
+def _signed_area(profile):
+    x, y = profile[:, 0], profile[:, 1]
+    return 0.5 * np.sum(x * np.roll(y, -1) - np.roll(x, -1) * y)
+
+
+def triangulate(profile):
+    """
+    Ear-clipping triangulation of a simple polygon
+    Returns (M, 3) indices into `profile`, counter-clockwise.
+    """
+    profile = np.asarray(profile, dtype=np.float64)
+    order = list(range(len(profile)))
+    if _signed_area(profile) < 0:
+        order.reverse()
+
+    def cross(a, b, c):
+        return (b[0] - a[0]) * (c[1] - a[1]) - (b[1] - a[1]) * (c[0] - a[0])
+
+    scale = np.ptp(profile, axis=0).max() ** 2
+    eps = 1e-12 * scale
+    triangles = []
+    while len(order) > 3:
+        n = len(order)
+        for i in range(n):
+            ia, ib, ic = order[i - 1], order[i], order[(i + 1) % n]
+            a, b, c = profile[ia], profile[ib], profile[ic]
+            if cross(a, b, c) <= eps:
+                continue
+            others = profile[[j for j in order if j not in (ia, ib, ic)]]
+            inside = (
+                (cross(a, b, others.T) >= -eps)
+                & (cross(b, c, others.T) >= -eps)
+                & (cross(c, a, others.T) >= -eps)
+            )
+            if not inside.any():
+                triangles.append((ia, ib, ic))
+                del order[i]
+                break
+        else:
+            # Only collinear vertices left: drop one, it adds no area
+            del order[int(np.argmin([
+                abs(cross(profile[order[i - 1]], profile[order[i]], profile[order[(i + 1) % n]]))
+                for i in range(n)
+            ]))]
+    triangles.append(tuple(order))
+    return np.array(triangles, dtype=np.int64)
+
+
+def _oriented(mesh):
+    if mesh.volume < 0:
+        mesh.invert()
+    return mesh
+
+
+def revolve_vertices(profile, sections, on_axis=None):
+    """
+    Vertex layout of `revolve`: one vertex per pole, one ring of
+    `sections` vertices per other profile point, in profile order
+    """
+    profile = np.asarray(profile, dtype=np.float64)
+    if on_axis is None:
+        on_axis = np.abs(profile[:, 0]) <= 1e-12
+    theta = np.linspace(0, 2 * np.pi, sections, endpoint=False)
+    counts = np.where(on_axis, 1, sections)
+    radius = np.repeat(profile[:, 0], counts)
+    angle = np.concatenate([theta[:c] for c in counts])
+    return np.column_stack([
+        radius * np.cos(angle),
+        radius * np.sin(angle),
+        np.repeat(profile[:, 1], counts),
+    ])
+
+
+def revolve(profile, sections=64):
+    """
+    Revolve a closed (r, z) profile a full turn about Z
+    Vertices with r == 0 collapse to a single pole; edges along the
+    axis are dropped, so profiles may start and end on it.
+    """
+    profile = np.asarray(profile, dtype=np.float64)
+    on_axis = np.abs(profile[:, 0]) <= 1e-12
+    vertices = revolve_vertices(profile, sections, on_axis)
+
+    counts = np.where(on_axis, 1, sections)
+    start = np.concatenate([[0], np.cumsum(counts)[:-1]])
+
+    j = np.arange(sections)
+    k = (j + 1) % sections
+    faces = []
+    for i in range(len(profile)):
+        i1 = (i + 1) % len(profile)
+        p, q = start[i], start[i1]
+        if on_axis[i] and on_axis[i1]:
+            continue
+        if on_axis[i]:
+            faces.append(np.column_stack([np.full(sections, p), q + k, q + j]))
+        elif on_axis[i1]:
+            faces.append(np.column_stack([p + j, p + k, np.full(sections, q)]))
+        else:
+            faces.append(np.column_stack([p + j, p + k, q + k]))
+            faces.append(np.column_stack([p + j, q + k, q + j]))
+
+    return _oriented(trimesh.Trimesh(vertices, np.vstack(faces), process=False))
+
+
+def extrude_vertices(profile, height, axis=2, center=False):
+    """Vertex layout of `extrude`: bottom copy of the profile, then top"""
+    profile = np.asarray(profile, dtype=np.float64)
+    n = len(profile)
+    z0 = -height / 2 if center else 0.0
+    vertices = np.vstack([
+        np.column_stack([profile, np.full(n, z0)]),
+        np.column_stack([profile, np.full(n, z0 + height)]),
+    ])
+    return np.roll(vertices, axis + 1, axis=1)
+
+
+def extrude(profile, height, axis=2, center=False, caps=None):
+    """
+    Extrude a closed 2D profile along `axis` from 0 to height
+    The profile spans the two axes that follow it cyclically: (x, y) for
+    Z, (y, z) for X, (z, x) for Y. center=True straddles the origin.
+    `caps` (counter-clockwise triangles) skips the ear clipping.
+    """
+    profile = np.asarray(profile, dtype=np.float64)
+    n = len(profile)
+    if caps is None:
+        caps = triangulate(profile)
+    vertices = extrude_vertices(profile, height, axis, center)
+
+    i = np.arange(n)
+    i1 = (i + 1) % n
+    faces = np.vstack([
+        caps[:, ::-1],
+        caps + n,
+        np.column_stack([i, i1, i1 + n]),
+        np.column_stack([i, i1 + n, i + n]),
+    ])
+
+    return _oriented(trimesh.Trimesh(vertices, faces, process=False))
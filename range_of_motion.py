@@ -0,0 +1,138 @@
+from collections import namedtuple
+
+import numpy as np
+import trimesh
+
+from mesh_distance import points_inside
+
+# ========================================
+# RANGE OF MOTION (SWING / TWIST SWEEP)
+# ========================================
+RangeOfMotion = namedtuple(
+    "RangeOfMotion",
+    ["swing_x", "swing_y", "twist", "collision", "collision_map", "swing_limit"],
+)
+
+
+def swing_twist_matrices(swing_x, swing_y, twist):
+    """
+    Stacked rotations for every (swing_x, swing_y, twist) in degrees
+    Same order as BallJointSimulator: X swing, then Y swing, then twist
+    Returns (N, 3, 3)
+    """
+    ax, ay, az = (np.radians(np.asarray(a, dtype=np.float64)) for a in (swing_x, swing_y, twist))
+    cx, sx = np.cos(ax), np.sin(ax)
+    cy, sy = np.cos(ay), np.sin(ay)
+    cz, sz = np.cos(az), np.sin(az)
+
+    # Rz @ Ry @ Rx written out element-wise
+    R = np.empty(ax.shape + (3, 3))
+    R[..., 0, 0] = cz * cy
+    R[..., 0, 1] = cz * sy * sx - sz * cx
+    R[..., 0, 2] = cz * sy * cx + sz * sx
+    R[..., 1, 0] = sz * cy
+    R[..., 1, 1] = sz * sy * sx + cz * cx
+    R[..., 1, 2] = sz * sy * cx - cz * sx
+    R[..., 2, 0] = -sy
+    R[..., 2, 1] = cy * sx
+    R[..., 2, 2] = cy * cx
+    return R
+
+
+def _tilt(rotations):
+    """Angle (degrees) between the rest axis and where each rotation takes it"""
+    return np.degrees(np.arccos(np.clip(rotations[:, 2, 2], -1.0, 1.0)))
+
+
+def _collisions(fixed, pivot, points, rotations, always, batch_points):
+    """Which rotations (about `pivot`) put any of `points` inside `fixed`"""
+    # Test points in growing blocks; a pose that already collides is
+    # dropped, so most of the grid is resolved by the first few points
+    collision = np.full(len(rotations), always)
+    start, block = 0, 32
+    while start < len(points) and not always:
+        live = np.nonzero(~collision)[0]
+        if len(live) == 0:
+            break
+        block_points = points[start:start + block]
+        chunk = max(1, batch_points // len(block_points))
+        for first in range(0, len(live), chunk):
+            poses = live[first:first + chunk]
+            posed = np.einsum("pij,vj->pvi", rotations[poses], block_points)
+            inside = points_inside(fixed, posed.reshape(-1, 3) + pivot)
+            collision[poses] = inside.reshape(len(poses), -1).any(axis=1)
+        start += block
+        block *= 2
+    return collision
+
+
+def range_of_motion(
+    moving,
+    fixed,
+    pivot=(0, 0, 0),
+    swing_range=(-90, 90),
+    swing_steps=61,
+    twist_range=(-180, 180),
+    twist_steps=9,
+    num_samples=5000,
+    batch_points=2_000_000,
+    refine_steps=10,
+):
+    """
+    Collision sweep of `moving` rotating about `pivot` against `fixed`
+    A pose collides when any moving vertex or surface sample lands inside
+    the watertight fixed part. Rotation about the pivot keeps every point
+    at its radius, so points whose sphere never reaches the fixed part
+    are resolved once instead of per pose. swing_limit never reaches a
+    colliding pose; `refine_steps` bisections set how close it gets.
+    """
+    pivot = np.asarray(pivot, dtype=np.float64)
+    points = np.vstack([moving.vertices, moving.sample(num_samples, seed=0)]) - pivot
+
+    # Radial culling against the fixed part's distance shell
+    radius = np.linalg.norm(points, axis=1)
+    _, near, _ = trimesh.proximity.closest_point(fixed, pivot[None])
+    far = np.linalg.norm(fixed.vertices - pivot, axis=1).max()
+    static = (radius < near[0]) | (radius > far)
+    always = bool(points_inside(fixed, points[static] + pivot).any())
+    points = points[~static]
+    points = points[np.random.default_rng(0).permutation(len(points))]
+
+    swing_x = np.linspace(*swing_range, swing_steps)
+    swing_y = np.linspace(*swing_range, swing_steps)
+    twist = np.linspace(*twist_range, twist_steps)
+    gx, gy, gt = np.meshgrid(swing_x, swing_y, twist, indexing="ij")
+    rotations = swing_twist_matrices(gx.ravel(), gy.ravel(), gt.ravel())
+
+    collision = _collisions(fixed, pivot, points, rotations, always, batch_points)
+    collision = collision.reshape(gx.shape)
+
+    # Largest cone about the rest axis that contains no colliding pose. The
+    # first colliding grid pose only bounds it from above, so bisect along
+    # the swing direction of every colliding pose within a grid step of it
+    # for the last collision-free tilt
+    swing = _tilt(rotations)
+    hit = collision.ravel()
+    if hit.any():
+        step = abs(swing_x[1] - swing_x[0]) if swing_steps > 1 else 0.0
+        rays = np.nonzero(hit & (swing <= swing[hit].min() + step))[0]
+        rx, ry, rt = gx.ravel()[rays], gy.ravel()[rays], gt.ravel()[rays]
+        lo, hi = np.zeros(len(rays)), np.ones(len(rays))
+        for _ in range(refine_steps):
+            mid = (lo + hi) / 2
+            inside = _collisions(fixed, pivot, points, swing_twist_matrices(mid * rx, mid * ry, rt),
+                                 always, batch_points)
+            hi = np.where(inside, mid, hi)
+            lo = np.where(inside, lo, mid)
+        swing_limit = _tilt(swing_twist_matrices(lo * rx, lo * ry, rt)).min()
+    else:
+        swing_limit = swing.max()
+
+    return RangeOfMotion(
+        swing_x=swing_x,
+        swing_y=swing_y,
+        twist=twist,
+        collision=collision,
+        collision_map=collision.any(axis=2),
+        swing_limit=np.radians(swing_limit),
+    )
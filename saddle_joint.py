@@ -1,6 +1,17 @@
 import trimesh
 import numpy as np
-import polyscope as ps
+
+import ik
+from csg_cache import cache_for, cached_difference
+from design_graph import DesignGraph
+from kinematic_tree import KinematicTree, rotational, translational
+from posed_mesh import PosedMesh
+from profiles import annular_sector, annular_sector_caps, extrude, rectangle, revolve
+from sdf import SignedDistanceField
+from socket_shell import truncated_shell
+from templates import extruded, revolved
+from tessellation import sections_for, subdivisions_for
+from workspace import workspace
 
 # ======================================================
 # PARAMETERS (OPTIMIZATION-READY)
@@ -12,6 +23,7 @@ stud_radius = 3.0
 stud_length = 20.0
 clearance = 0.4
 socket_thickness = 3.0
+ball_swing_deg = 30.0
 
 # ---- Hinge joint ----
 hinge_radius = 6.0
@@ -25,6 +37,11 @@ rail_length = 45.0
 carriage_length = 18.0
 slider_clearance = 0.4
 
+# ---- Viewer ----
+highlight_collisions = True  # bake fixed-part SDFs, shade moving parts
+view_lod = "coarse"          # chordal tolerance for the viewer (tessellation.py)
+build_method = "profile"     # "csg" for the boolean reference parts (cached on disk)
+
 # ======================================================
 # TRANSFORM HELPERS
 # ======================================================
@@ -39,216 +56,400 @@ def T(offset):
 # ======================================================
 # BALL JOINT GEOMETRY
 # ======================================================
-ball = trimesh.primitives.Sphere(radius=ball_radius, subdivisions=3)
-
-stud = trimesh.primitives.Cylinder(
-    radius=stud_radius,
-    height=stud_length,
-    sections=32
-)
-stud.apply_translation([0, 0, stud_length / 2 + ball_radius])
-
-ball_part = trimesh.util.concatenate([ball, stud])
-
-outer = trimesh.primitives.Sphere(
-    radius=ball_radius + clearance + socket_thickness,
-    subdivisions=3
-)
-inner = trimesh.primitives.Sphere(
-    radius=ball_radius + clearance,
-    subdivisions=3
-)
-
-cut = trimesh.creation.box([100, 100, 100])
-cut.apply_translation([0, 0, ball_radius])
+def build_ball_part(ball_radius=ball_radius, stud_radius=stud_radius, stud_length=stud_length, lod=None):
+    ball = trimesh.primitives.Sphere(
+        radius=ball_radius,
+        subdivisions=subdivisions_for(ball_radius, lod, 3)
+    )
 
-socket = outer.difference(inner).difference(cut)
+    stud = trimesh.primitives.Cylinder(
+        radius=stud_radius,
+        height=stud_length,
+        sections=sections_for(stud_radius, lod, 32)
+    )
+    stud.apply_translation([0, 0, stud_length / 2 + ball_radius])
+
+    return trimesh.util.concatenate([ball, stud])
+
+def build_socket(
+    ball_radius=ball_radius,
+    clearance=clearance,
+    socket_thickness=socket_thickness,
+    sections=64,
+    lod=None,
+    method="profile",
+    backend=None,
+    cache=None,
+):
+    outer_radius = ball_radius + clearance + socket_thickness
+    subdivisions = subdivisions_for(outer_radius, lod, 3)
+
+    if method == "profile":
+        # Cut plane sits at the bottom face of the original 100 mm cut box
+        # (z = ball_radius - 50), which lies below the shell
+        return truncated_shell(
+            ball_radius + clearance,
+            outer_radius,
+            ball_radius - 50,
+            sections_for(outer_radius, lod, sections, sphere=True),
+        )
+    if method != "csg":
+        raise ValueError(f"unknown method {method!r}")
+    return cached_difference(cache, backend,
+                             ("sphere", outer_radius, subdivisions),
+                             [("sphere", ball_radius + clearance, subdivisions),
+                              ("box", [100, 100, 100], [0, 0, ball_radius])])
 
 # ======================================================
 # HINGE GEOMETRY
 # ======================================================
-barrel = trimesh.primitives.Cylinder(
-    radius=hinge_radius,
-    height=hinge_length,
-    sections=64
-)
-barrel.apply_transform(R(90, [0, 1, 0]))
-
-hinge_connector = trimesh.primitives.Cylinder(
-    radius=stud_radius,
-    height=stud_length,
-    sections=32
-)
-hinge_connector.apply_translation([0, 0, stud_length / 2])
-
-hinge_moving = trimesh.util.concatenate([barrel, hinge_connector])
-
-outer = trimesh.primitives.Cylinder(
-    radius=hinge_radius + slider_clearance + hinge_wall,
-    height=hinge_length,
-    sections=64
-)
-inner = trimesh.primitives.Cylinder(
-    radius=hinge_radius + slider_clearance,
-    height=hinge_length + 1,
-    sections=64
-)
-
-outer.apply_transform(R(90, [0, 1, 0]))
-inner.apply_transform(R(90, [0, 1, 0]))
-
-cut = trimesh.creation.box([100, 100, 100])
-cut.apply_translation([0, -50, 0])
+def build_hinge_moving(
+    hinge_radius=hinge_radius,
+    hinge_length=hinge_length,
+    stud_radius=stud_radius,
+    stud_length=stud_length,
+    lod=None,
+):
+    barrel = trimesh.primitives.Cylinder(
+        radius=hinge_radius,
+        height=hinge_length,
+        sections=sections_for(hinge_radius, lod, 64)
+    )
+    barrel.apply_transform(R(90, [0, 1, 0]))
 
-hinge_fixed = outer.difference(inner).difference(cut)
+    hinge_connector = trimesh.primitives.Cylinder(
+        radius=stud_radius,
+        height=stud_length,
+        sections=sections_for(stud_radius, lod, 32)
+    )
+    hinge_connector.apply_translation([0, 0, stud_length / 2])
+
+    return trimesh.util.concatenate([barrel, hinge_connector])
+
+def build_hinge_fixed(
+    hinge_radius=hinge_radius,
+    hinge_length=hinge_length,
+    hinge_wall=hinge_wall,
+    slider_clearance=slider_clearance,
+    lod=None,
+    method="profile",
+    backend=None,
+    cache=None,
+):
+    sections = sections_for(hinge_radius + slider_clearance + hinge_wall, lod, 64)
+
+    if method == "profile":
+        # Half ring (y >= 0) in the YZ plane, extruded along the hinge axis
+        ring = annular_sector(
+            hinge_radius + slider_clearance,
+            hinge_radius + slider_clearance + hinge_wall,
+            -np.pi / 2, np.pi / 2, sections
+        )
+        caps = annular_sector_caps(sections, -np.pi / 2, np.pi / 2)
+        return extrude(ring, hinge_length, axis=0, center=True, caps=caps)
+    if method != "csg":
+        raise ValueError(f"unknown method {method!r}")
+    return cached_difference(cache, backend,
+                             ("cylinder_x", hinge_radius + slider_clearance + hinge_wall, hinge_length, sections),
+                             [("cylinder_x", hinge_radius + slider_clearance, hinge_length + 1, sections),
+                              ("box", [100, 100, 100], [0, -50, 0])])
 
 # ======================================================
 # SLIDER GEOMETRY
 # ======================================================
-rail = trimesh.primitives.Cylinder(
-    radius=rail_radius,
-    height=rail_length,
-    sections=64
-)
-rail.apply_translation([0, 0, rail_length / 2])
-
-outer = trimesh.primitives.Cylinder(
-    radius=rail_radius + 3,
-    height=carriage_length,
-    sections=64
-)
-inner = trimesh.primitives.Cylinder(
-    radius=rail_radius + slider_clearance,
-    height=carriage_length + 1,
-    sections=64
-)
-
-outer.apply_translation([0, 0, carriage_length / 2])
-inner.apply_translation([0, 0, (carriage_length + 1) / 2])
-
-carriage = outer.difference(inner)
-
-# ======================================================
-# JOINT CLASSES
-# ======================================================
-class BallJoint:
-    def __init__(self, mesh):
-        self.mesh0 = mesh
-        self.mesh = mesh.copy()
-        self.transform = np.eye(4)
-        self.child_frame = T([0, 0, ball_radius + stud_length])
-
-    def apply(self, ax, ay):
-        self.transform = R(ax, [1, 0, 0]) @ R(ay, [0, 1, 0])
-        self.mesh = self.mesh0.copy()
-        self.mesh.apply_transform(self.transform)
-
-class HingeJoint:
-    def __init__(self, fixed, moving):
-        self.fixed = fixed
-        self.moving0 = moving
-        self.moving = moving.copy()
-
-    def apply(self, parent_tf, angle):
-        self.moving = self.moving0.copy()
-        self.moving.apply_transform(parent_tf @ R(angle, [1, 0, 0]))
-
-class SliderJoint:
-    def __init__(self, rail, carriage):
-        self.rail = rail
-        self.carriage0 = carriage
-        self.carriage = carriage.copy()
-
-    def apply(self, parent_tf, t):
-        self.carriage = self.carriage0.copy()
-        self.carriage.apply_transform(parent_tf @ T([0, 0, t]))
+def build_rail(rail_radius=rail_radius, rail_length=rail_length, lod=None):
+    rail = trimesh.primitives.Cylinder(
+        radius=rail_radius,
+        height=rail_length,
+        sections=sections_for(rail_radius, lod, 64)
+    )
+    rail.apply_translation([0, 0, rail_length / 2])
+    return rail
+
+def build_carriage(
+    rail_radius=rail_radius,
+    carriage_length=carriage_length,
+    slider_clearance=slider_clearance,
+    lod=None,
+    method="profile",
+    backend=None,
+    cache=None,
+):
+    sections = sections_for(rail_radius + 3, lod, 64)
+
+    if method == "profile":
+        # Tube wall as one (r, z) rectangle, revolved about the rail axis
+        tube = rectangle(rail_radius + slider_clearance, 0, rail_radius + 3, carriage_length)
+        return revolve(tube, sections)
+    if method != "csg":
+        raise ValueError(f"unknown method {method!r}")
+    return cached_difference(cache, backend,
+                             ("cylinder_z", rail_radius + 3, carriage_length, sections,
+                              [0, 0, carriage_length / 2]),
+                             [("cylinder_z", rail_radius + slider_clearance, carriage_length + 1, sections,
+                               [0, 0, (carriage_length + 1) / 2])])
 
 # ======================================================
-# POLYSCOPE SETUP
+# PARAMETRIC TEMPLATES (FIXED CONNECTIVITY)
 # ======================================================
-ps.init()
-
-ball_joint = BallJoint(ball_part)
-hinge_joint = HingeJoint(hinge_fixed, hinge_moving)
-slider_joint = SliderJoint(rail, carriage)
-
-angles = np.linspace(-30, 30, 120)
-hinge_angles = np.linspace(-hinge_range_deg / 2, hinge_range_deg / 2, 120)
-slide_vals = np.linspace(0, rail_length - carriage_length, 120)
-
-frame = 0
-
-def animate():
-    global frame
-
-    ax = angles[frame % len(angles)]
-    ay = angles[(frame * 2) % len(angles)]
-    hinge_angle = hinge_angles[frame % len(hinge_angles)]
-    slide = slide_vals[frame % len(slide_vals)]
-
-    # Ball joint
-    ball_joint.apply(ax, ay)
-
-    # Hinge joint
-    hinge_parent_tf = ball_joint.transform @ ball_joint.child_frame
-    hinge_joint.apply(hinge_parent_tf, hinge_angle)
-
-    # Slider joint
-    slider_parent_tf = hinge_parent_tf @ R(hinge_angle, [1, 0, 0])
-    slider_joint.apply(slider_parent_tf, slide)
-
-    # Visualize
-    ps.register_surface_mesh(
-        "socket",
-        socket.vertices,
-        socket.faces,
-        transparency=0.5,
-        color=(1.0, 0.6, 0.2)
+def hinge_fixed_template(
+    hinge_radius=hinge_radius,
+    hinge_length=hinge_length,
+    hinge_wall=hinge_wall,
+    slider_clearance=slider_clearance,
+    lod=None,
+):
+    """build_hinge_fixed() whose radii and length update in place"""
+    sections = sections_for(hinge_radius + slider_clearance + hinge_wall, lod, 64)
+
+    def profile(hinge_radius, hinge_length, hinge_wall, slider_clearance):
+        ring = annular_sector(
+            hinge_radius + slider_clearance,
+            hinge_radius + slider_clearance + hinge_wall,
+            -np.pi / 2, np.pi / 2, sections
+        )
+        return ring, hinge_length
+
+    return extruded(
+        profile,
+        annular_sector_caps(sections, -np.pi / 2, np.pi / 2),
+        {
+            "hinge_radius": hinge_radius,
+            "hinge_length": hinge_length,
+            "hinge_wall": hinge_wall,
+            "slider_clearance": slider_clearance,
+        },
+        axis=0,
+        center=True,
     )
 
-    ps.register_surface_mesh(
-        "ball",
-        ball_joint.mesh.vertices,
-        ball_joint.mesh.faces,
-        transparency=0.4
-    )
+def carriage_template(
+    rail_radius=rail_radius,
+    carriage_length=carriage_length,
+    slider_clearance=slider_clearance,
+    lod=None,
+):
+    """build_carriage() whose radii and length update in place"""
+    def profile(rail_radius, carriage_length, slider_clearance):
+        return rectangle(rail_radius + slider_clearance, 0, rail_radius + 3, carriage_length)
+
+    return revolved(profile, sections_for(rail_radius + 3, lod, 64), {
+        "rail_radius": rail_radius,
+        "carriage_length": carriage_length,
+        "slider_clearance": slider_clearance,
+    })
 
-    ps.register_surface_mesh(
-        "hinge_fixed",
-        hinge_joint.fixed.vertices,
-        hinge_joint.fixed.faces,
-        transparency=0.5
-    )
-
-    ps.register_surface_mesh(
-        "hinge_moving",
-        hinge_joint.moving.vertices,
-        hinge_joint.moving.faces,
-        transparency=0.4
-    )
+# ======================================================
+# KINEMATIC TREE
+# ======================================================
+# Socket at the root. The ball swings on two DOFs; the hinge barrel rides
+# on the ball's child frame at the stud tip and the carriage slides along
+# the barrel's Z. The hinge cradle and the rail stay at the world origin,
+# where the viewer has always shown them.
+collision_pairs = {"ball": "socket", "hinge_moving": "hinge_fixed", "carriage": "rail"}
+chain_links = ["ball", "hinge_moving", "carriage"]
+
+def chain_tree(parts=None, child_offset=ball_radius + stud_length):
+    """Ball → Hinge → Slider as a KinematicTree; `parts` maps link name -> mesh"""
+    parts = parts or {}
+    tree = KinematicTree()
+    tree.add_link("socket", parts.get("socket"))
+    tree.add_link("ball", parts.get("ball"), parent="socket", dofs=[
+        rotational("ball_x", [1, 0, 0], -ball_swing_deg, ball_swing_deg),
+        rotational("ball_y", [0, 1, 0], -ball_swing_deg, ball_swing_deg),
+    ])
+    tree.add_link("hinge_fixed", parts.get("hinge_fixed"), parent="socket")
+    tree.add_link("hinge_moving", parts.get("hinge_moving"), parent="ball",
+                  origin=T([0, 0, child_offset]),
+                  dofs=[rotational("hinge", [1, 0, 0], -hinge_range_deg / 2, hinge_range_deg / 2)])
+    tree.add_link("rail", parts.get("rail"), parent="socket")
+    tree.add_link("carriage", parts.get("carriage"), parent="hinge_moving",
+                  dofs=[translational("slide", [0, 0, 1], 0, rail_length - carriage_length)])
+    return tree
+
+def build_parts(lod=view_lod, method=build_method, cache=None):
+    """
+    Every part of the chain at one level of detail
+    method="csg" reuses booleans through `cache` (default: the on-disk CSGCache).
+    """
+    cache = cache_for(method) if cache is None else cache
+    booleans = {"method": method, "cache": cache}
+    return {
+        "socket": build_socket(lod=lod, **booleans),
+        "ball": build_ball_part(lod=lod),
+        "hinge_fixed": build_hinge_fixed(lod=lod, **booleans),
+        "hinge_moving": build_hinge_moving(lod=lod),
+        "rail": build_rail(lod=lod),
+        "carriage": build_carriage(lod=lod, **booleans),
+    }
+
+def chain_transforms(q, child_offset=ball_radius + stud_length):
+    """
+    World transforms of ball, hinge_moving and carriage: (N, 4) -> (N, 3, 4, 4)
+    Rows are (ball_x, ball_y, hinge) in degrees and the slide in mm.
+    """
+    tree = chain_tree(child_offset=child_offset)
+    return tree.forward(q)[..., [tree.index[name] for name in chain_links], :, :]
+
+def chain_jacobian(q, child_offset=ball_radius + stud_length, tip=(0, 0, carriage_length)):
+    """
+    Analytic Jacobian of the carriage tip: (N, 4) -> Jacobian with (N, 6, 4) matrix
+    Columns follow the axes [1,0,0] and [0,1,0] of the ball, the hinge's X
+    and the slider's Z; see KinematicTree.jacobian.
+    """
+    return chain_tree(child_offset=child_offset).jacobian(q, "carriage", tip)
+
+def chain_ik(targets, q0=None, child_offset=ball_radius + stud_length, tip=(0, 0, carriage_length), **options):
+    """
+    Joint values (ball_x, ball_y, hinge, slide) putting the carriage tip on
+    each of (N, 3) targets, within the chain's limits; see ik.solve
+    """
+    return ik.solve(chain_tree(child_offset=child_offset), "carriage", targets, tip, q0, **options)
+
+def chain_workspace(samples=1_000_000, voxel_size=1.0, child_offset=ball_radius + stud_length,
+                    tip=(0, 0, carriage_length), **options):
+    """Sparse voxel map of the carriage tip's reach; see workspace.workspace"""
+    return workspace(chain_tree(child_offset=child_offset), "carriage", tip, samples, voxel_size, **options)
 
-    ps.register_surface_mesh(
-        "rail",
-        slider_joint.rail.vertices,
-        slider_joint.rail.faces,
-        transparency=0.5
-    )
+# ======================================================
+# POLYSCOPE SETUP
+# ======================================================
+class ChainAnimator:
+    """Kinematic tree driven by a per-frame callback"""
+
+    colors = {"socket": (1.0, 0.6, 0.2)}
+
+    def __init__(self, tree, highlight_collisions=highlight_collisions):
+        import polyscope as ps
+
+        self.tree = tree
+        self.angles = np.linspace(-ball_swing_deg, ball_swing_deg, 120)
+        self.hinge_angles = np.linspace(-hinge_range_deg / 2, hinge_range_deg / 2, 120)
+        self.slide_vals = np.linspace(0, rail_length - carriage_length, 120)
+        self.frame = 0
+
+        def mesh(name):
+            return tree.links[tree.index[name]].mesh
+
+        # Fixed parts never move: bake each once, query moving vertices per frame
+        self.fixed_sdf = {
+            name: SignedDistanceField(mesh(fixed))
+            for name, fixed in collision_pairs.items()
+            if highlight_collisions and not mesh(fixed).is_empty
+        }
+        # Posed vertices are only needed where there is an SDF to query
+        self.posed = {name: PosedMesh(mesh(name)) for name in self.fixed_sdf}
+
+        # Register every structure once; frames only push 4x4 transforms
+        for link in tree.links:
+            if link.mesh is None or link.name in collision_pairs:
+                continue
+            ps.register_surface_mesh(
+                link.name,
+                link.mesh.vertices,
+                link.mesh.faces,
+                transparency=0.5,
+                **({"color": self.colors[link.name]} if link.name in self.colors else {})
+            ).set_transform(tree.transform(link.name))
+
+        self.moving_meshes = {
+            name: ps.register_surface_mesh(
+                name,
+                mesh(name).vertices,
+                mesh(name).faces,
+                transparency=0.4
+            )
+            for name in collision_pairs
+        }
+
+    def show_pose(self, name, transform):
+        """Move a registered part and shade it by baked clearance (negative = collision)"""
+        structure = self.moving_meshes[name]
+        structure.set_transform(transform)
+        if name in self.posed:
+            structure.add_scalar_quantity(
+                "clearance",
+                self.fixed_sdf[name](self.posed[name].apply(transform)),
+                enabled=True,
+                cmap="coolwarm"
+            )
+
+    def animate(self):
+        frame = self.frame
+
+        # Only the links below a changed DOF are recomputed
+        self.tree.set(
+            ball_x=self.angles[frame % len(self.angles)],
+            ball_y=self.angles[(frame * 2) % len(self.angles)],
+            hinge=self.hinge_angles[frame % len(self.hinge_angles)],
+            slide=self.slide_vals[frame % len(self.slide_vals)],
+        )
+
+        # Visualize
+        for name in self.moving_meshes:
+            self.show_pose(name, self.tree.transform(name))
+
+        self.frame += 1
 
-    ps.register_surface_mesh(
-        "carriage",
-        slider_joint.carriage.vertices,
-        slider_joint.carriage.faces,
-        transparency=0.4
+# ======================================================
+# DEPENDENCY GRAPH (INCREMENTAL REBUILD)
+# ======================================================
+def design_graph(lod=view_lod, **overrides):
+    """
+    Parameter -> part graph of the chain (see design_graph.py)
+    e.g. `stud_length` only touches the ball part, the hinge connector and
+    the ball's child frame; `slider_clearance` only the cradle and carriage.
+    """
+    graph = DesignGraph(
+        ball_radius=ball_radius,
+        stud_radius=stud_radius,
+        stud_length=stud_length,
+        clearance=clearance,
+        socket_thickness=socket_thickness,
+        hinge_radius=hinge_radius,
+        hinge_length=hinge_length,
+        hinge_wall=hinge_wall,
+        rail_radius=rail_radius,
+        rail_length=rail_length,
+        carriage_length=carriage_length,
+        slider_clearance=slider_clearance,
+        lod=lod,
     )
-
-    frame += 1
-
-ps.set_user_callback(animate)
-
-print("\n✅ Ball → Hinge → Slider chain")
-print("• All transforms are local")
-print("• Parent–child hierarchy respected")
-print("• Ball (SO3) + Hinge (R) + Slider (T)")
-print("• Fully optimization-ready")
-
-ps.show()
+    graph.set(**overrides)
+
+    graph.add("ball", build_ball_part, ["ball_radius", "stud_radius", "stud_length", "lod"])
+    graph.add("socket", build_socket, ["ball_radius", "clearance", "socket_thickness", "lod"])
+    graph.add("child_frame", lambda ball_radius, stud_length: T([0, 0, ball_radius + stud_length]),
+              ["ball_radius", "stud_length"])
+    graph.add("hinge_moving", build_hinge_moving,
+              ["hinge_radius", "hinge_length", "stud_radius", "stud_length", "lod"])
+    graph.add("hinge_fixed", build_hinge_fixed,
+              ["hinge_radius", "hinge_length", "hinge_wall", "slider_clearance", "lod"])
+    graph.add("rail", build_rail, ["rail_radius", "rail_length", "lod"])
+    graph.add("carriage", build_carriage,
+              ["rail_radius", "carriage_length", "slider_clearance", "lod"])
+    graph.add("hinge_sdf", lambda hinge_fixed: SignedDistanceField(hinge_fixed),
+              inputs=["hinge_fixed"])
+    graph.add("rail_sdf", lambda rail: SignedDistanceField(rail), inputs=["rail"])
+    return graph
+
+def main():
+    """Build the Ball → Hinge → Slider chain and open the viewer"""
+    import polyscope as ps
+
+    ps.init()
+
+    animator = ChainAnimator(chain_tree(build_parts(view_lod)))
+    ps.set_user_callback(animator.animate)
+
+    print("\n✅ Ball → Hinge → Slider chain")
+    print("• All transforms are local")
+    print("• Parent–child hierarchy respected")
+    print("• Ball (SO3) + Hinge (R) + Slider (T)")
+    print("• Fully optimization-ready")
+
+    ps.show()
+
+
+if __name__ == "__main__":
+    main()
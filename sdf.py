@@ -0,0 +1,78 @@
+import numpy as np
+import trimesh
+from scipy import ndimage
+from scipy.spatial import cKDTree
+
+from mesh_distance import points_inside
+
+# ========================================
+# NARROW-BAND SIGNED DISTANCE FIELD
+# ========================================
+class SignedDistanceField:
+    """
+    Voxel SDF of a fixed, watertight part (negative inside, positive outside)
+    Exact distances are only computed within `band` of the surface; the rest
+    of the grid is clamped to +/- band, which is all a collision test needs.
+    """
+
+    def __init__(self, mesh, voxel_size=0.25, band=2.0):
+        self.voxel_size = float(voxel_size)
+        self.band = float(band)
+
+        pad = self.band + self.voxel_size
+        self.origin = mesh.bounds[0] - pad
+        self.shape = np.ceil((mesh.bounds[1] + pad - self.origin) / self.voxel_size).astype(np.int64) + 1
+
+        axes = [self.origin[i] + self.voxel_size * np.arange(self.shape[i]) for i in range(3)]
+        grid = np.stack(np.meshgrid(*axes, indexing="ij"), axis=-1).reshape(-1, 3)
+
+        # Rasterize a dense surface sample; a distance transform of the
+        # occupied voxels picks out the narrow band
+        spacing = self.voxel_size
+        count = int(np.ceil(mesh.area / spacing ** 2))
+        samples, sample_faces = trimesh.sample.sample_surface(mesh, count, seed=0)
+        cells = np.floor((samples - self.origin) / self.voxel_size + 0.5).astype(np.int64)
+        occupied = np.zeros(self.shape, dtype=bool)
+        occupied[tuple(cells.T)] = True
+        coarse = ndimage.distance_transform_edt(~occupied) * self.voxel_size
+        near = coarse.ravel() <= self.band + self.voxel_size
+
+        # Exact distance to the faces owning the nearest few samples
+        _, nearest = cKDTree(samples).query(grid[near], k=4)
+        faces = sample_faces[nearest]
+        points = np.repeat(grid[near], faces.shape[1], axis=0)
+        closest = trimesh.triangles.closest_point(mesh.triangles[faces.ravel()], points)
+        exact = np.linalg.norm(closest - points, axis=1).reshape(faces.shape).min(axis=1)
+
+        distance = np.full(len(grid), self.band)
+        distance[near] = np.minimum(exact, self.band)
+
+        sign = np.where(points_inside(mesh, grid), -1.0, 1.0)
+        self.values = (sign * distance).reshape(self.shape).astype(np.float32)
+
+    def __call__(self, points):
+        """Trilinear lookup; points outside the grid read as +band"""
+        points = np.asarray(points, dtype=np.float64)
+        u = (points - self.origin) / self.voxel_size
+        base = np.floor(u).astype(np.int64)
+        outside = np.any((base < 0) | (base >= self.shape - 1), axis=1)
+        base = np.clip(base, 0, self.shape - 2)
+        f = u - base
+
+        i, j, k = base.T
+        fx, fy, fz = f.T
+        v = self.values
+        c00 = v[i, j, k] * (1 - fx) + v[i + 1, j, k] * fx
+        c10 = v[i, j + 1, k] * (1 - fx) + v[i + 1, j + 1, k] * fx
+        c01 = v[i, j, k + 1] * (1 - fx) + v[i + 1, j, k + 1] * fx
+        c11 = v[i, j + 1, k + 1] * (1 - fx) + v[i + 1, j + 1, k + 1] * fx
+        c0 = c00 * (1 - fy) + c10 * fy
+        c1 = c01 * (1 - fy) + c11 * fy
+        result = c0 * (1 - fz) + c1 * fz
+
+        result[outside] = self.band
+        return result
+
+    def collides(self, points, margin=0.0):
+        """True if any point is inside the part (or closer than margin)"""
+        return bool(np.any(self(points) < margin))
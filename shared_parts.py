@@ -0,0 +1,136 @@
+import importlib
+import sys
+from collections import namedtuple
+from multiprocessing import shared_memory
+
+import numpy as np
+import trimesh
+from scipy.spatial import cKDTree
+
+# ========================================
+# ZERO-COPY PART HANDOFF BETWEEN PROCESSES
+# ========================================
+# The parent publishes a part once: every numpy array it owns is copied
+# into one shared-memory block and a small picklable handle describes
+# where each array lives. Workers `attach(handle)` and get an object of
+# the same type whose arrays are read-only views into that block, so no
+# mesh, BVH or SDF grid is rebuilt or unpickled per task.
+#
+#   with publish(socket_sdf) as shared:
+#       pool.map(check_pose, [(shared.handle, pose) for pose in poses])
+#
+# Trimesh objects carry vertices/faces. A cKDTree (or KDTree) carries its
+# points; its nodes live inside the extension object, so each attaching
+# process rebuilds them once around the shared points. Any other object
+# with a __dict__ (TriangleBVH, SignedDistanceField, PosedMesh...) carries
+# its ndarray attributes, with the remaining plain attributes pickled into
+# the handle. Arrays a class lists in `output_buffers` (PosedMesh.vertices)
+# are written per call, so each attaching process gets its own writable
+# copy of those instead.
+SharedHandle = namedtuple("SharedHandle", ["block", "cls", "arrays", "attributes"])
+
+_ALIGN = 64
+_attached = {}  # block name -> SharedMemory kept open in this process
+_trees = {}     # block name -> KD-tree rebuilt in this process
+
+
+def _class_path(obj):
+    cls = type(obj)
+    return cls.__module__, cls.__qualname__
+
+
+def _split(obj):
+    """(arrays, plain attributes) of a part"""
+    if isinstance(obj, trimesh.Trimesh):
+        return {"vertices": obj.vertices, "faces": obj.faces}, {}
+    if isinstance(obj, cKDTree):
+        return {"data": obj.data}, {"leafsize": obj.leafsize}
+    if not hasattr(obj, "__dict__"):
+        raise TypeError(
+            f"cannot publish {type(obj).__name__}: supported parts are trimesh.Trimesh, "
+            "scipy.spatial.cKDTree and objects whose state is in their __dict__"
+        )
+    arrays, attributes = {}, {}
+    for name, value in vars(obj).items():
+        if isinstance(value, np.ndarray):
+            arrays[name] = value
+        else:
+            attributes[name] = value
+    return arrays, attributes
+
+
+class SharedPart:
+    """Owner side of a published part; unlink it when workers are done"""
+
+    def __init__(self, obj):
+        arrays, attributes = _split(obj)
+        arrays = {name: np.ascontiguousarray(a) for name, a in arrays.items()}
+
+        layout, offset = [], 0
+        for name, a in arrays.items():
+            layout.append((name, offset, a.shape, a.dtype.str))
+            offset += -(-a.nbytes // _ALIGN) * _ALIGN
+
+        self.block = shared_memory.SharedMemory(create=True, size=max(offset, 1))
+        for (name, start, shape, dtype), a in zip(layout, arrays.values()):
+            view = np.ndarray(shape, dtype=dtype, buffer=self.block.buf, offset=start)
+            view[...] = a
+
+        self.handle = SharedHandle(self.block.name, _class_path(obj), tuple(layout), attributes)
+
+    def close(self):
+        """Release the block; publisher side also removes it from the system"""
+        self.block.close()
+        try:
+            self.block.unlink()
+        except FileNotFoundError:
+            pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def publish(obj):
+    """Copy a part's arrays into shared memory once; returns a SharedPart"""
+    return SharedPart(obj)
+
+
+def _open(name):
+    if name not in _attached:
+        if sys.version_info >= (3, 13):
+            block = shared_memory.SharedMemory(name=name, track=False)
+        else:
+            # Pool workers share the publisher's resource tracker, where
+            # the block is already registered, so attaching is a no-op there
+            block = shared_memory.SharedMemory(name=name)
+        _attached[name] = block
+    return _attached[name]
+
+
+def attach(handle):
+    """Rebuild a published part around read-only views of the shared block"""
+    block = _open(handle.block)
+    arrays = {}
+    for name, offset, shape, dtype in handle.arrays:
+        view = np.ndarray(shape, dtype=dtype, buffer=block.buf, offset=offset)
+        view.flags.writeable = False
+        arrays[name] = view
+
+    module, qualname = handle.cls
+    cls = getattr(importlib.import_module(module), qualname)
+    if issubclass(cls, trimesh.Trimesh):
+        return trimesh.Trimesh(arrays["vertices"], arrays["faces"], process=False, validate=False)
+    if issubclass(cls, cKDTree):
+        if handle.block not in _trees:
+            _trees[handle.block] = cls(arrays["data"], leafsize=handle.attributes["leafsize"], copy_data=False)
+        return _trees[handle.block]
+    for name in getattr(cls, "output_buffers", ()):
+        arrays[name] = np.array(arrays[name])
+
+    obj = cls.__new__(cls)
+    vars(obj).update(handle.attributes)
+    vars(obj).update(arrays)
+    return obj
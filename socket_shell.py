@@ -0,0 +1,76 @@
+import numpy as np
+import trimesh
+
+from profiles import arc, arc_steps, revolve
+
+# ========================================
+# TRUNCATED SPHERICAL SHELL (NO BOOLEANS)
+# ========================================
+# The socket is a surface of revolution: outer sphere cap, flat annular
+# rim on the cut plane and inner sphere cap. Revolving that closed (r, z)
+# profile about Z gives one watertight mesh whose rim vertices lie exactly
+# on the cut plane, with no CSG involved.
+
+def truncated_shell(inner_radius, outer_radius, cut_height, sections=64):
+    """
+    Spherical shell between inner_radius and outer_radius, keeping z <= cut_height
+    `sections` sets both the azimuthal count and the meridian angle step.
+    """
+    if cut_height <= -outer_radius:
+        return trimesh.Trimesh()
+
+    south = -np.pi / 2
+
+    if cut_height >= outer_radius:
+        parts = [
+            arc(outer_radius, south, np.pi / 2, sections),
+            arc(inner_radius, south, np.pi / 2, sections),
+        ]
+        meshes = [revolve(parts[0], sections), revolve(parts[1], sections)]
+        meshes[1].invert()
+        return trimesh.util.concatenate(meshes)
+
+    phi_outer = np.arcsin(cut_height / outer_radius)
+    outer_arc = arc(outer_radius, south, phi_outer, sections)
+    outer_arc[-1] = [np.sqrt(outer_radius**2 - cut_height**2), cut_height]
+
+    if cut_height <= -inner_radius:
+        # Cut below the cavity: a solid bowl closed by a disc
+        return revolve(np.vstack([outer_arc, [[0, cut_height]]]), sections)
+
+    if cut_height >= inner_radius:
+        # Cavity entirely below the cut: capped outer bowl plus inner sphere
+        bowl = revolve(np.vstack([outer_arc, [[0, cut_height]]]), sections)
+        cavity = revolve(arc(inner_radius, south, np.pi / 2, sections), sections)
+        cavity.invert()
+        return trimesh.util.concatenate([bowl, cavity])
+
+    steps = shell_steps(inner_radius, outer_radius, cut_height, sections)
+    return revolve(shell_profile(inner_radius, outer_radius, cut_height, *steps), sections)
+
+
+def shell_steps(inner_radius, outer_radius, cut_height, sections):
+    """Meridian segment counts (outer, inner) of the open-shell profile"""
+    south = -np.pi / 2
+    return (
+        arc_steps(south, np.arcsin(cut_height / outer_radius), sections),
+        arc_steps(np.arcsin(cut_height / inner_radius), south, sections),
+    )
+
+
+def shell_profile(inner_radius, outer_radius, cut_height, outer_steps, inner_steps):
+    """
+    (r, z) profile of a shell cut through its cavity (|cut_height| < inner_radius):
+    outer cap up to the rim, across the rim, back down the inner cap
+    """
+    if not -inner_radius < cut_height < inner_radius:
+        raise ValueError("cut plane must pass through the cavity")
+
+    south = -np.pi / 2
+    outer_arc = arc(outer_radius, south, np.arcsin(cut_height / outer_radius), 0, steps=outer_steps)
+    inner_arc = arc(inner_radius, np.arcsin(cut_height / inner_radius), south, 0, steps=inner_steps)
+
+    # Rim vertices exactly on the cut plane
+    outer_arc[-1] = [np.sqrt(outer_radius**2 - cut_height**2), cut_height]
+    inner_arc[0] = [np.sqrt(inner_radius**2 - cut_height**2), cut_height]
+    return np.vstack([outer_arc, inner_arc])
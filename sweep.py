@@ -0,0 +1,237 @@
+import argparse
+import csv
+import hashlib
+import importlib
+import inspect
+import itertools
+import json
+import multiprocessing
+import os
+import time
+from multiprocessing.connection import wait
+
+import numpy as np
+
+import feasibility
+from tessellation import lods
+
+# ========================================
+# PROCESS-POOL PARAMETER SWEEP
+# ========================================
+# Every variant (one point of the parameter grid) runs in its own worker
+# process so a hung boolean can be killed at its deadline without taking
+# the pool down. Rows are appended to <out_dir>/results.csv as variants
+# finish; re-running the same sweep skips variants already recorded as
+# "ok", so an interrupted sweep resumes where it stopped. Variants that
+# fail the analytic pre-filter (feasibility.py) are recorded as
+# "infeasible" without ever starting a worker.
+#
+#   python sweep.py ball_socket -p clearance=0.3:0.6:4 -p socket_thickness=2,3
+joints = {
+    "ball_socket": ("ball_and_socket_joint:evaluate", feasibility.ball_socket_feasibility),
+    "hinge": ("hinge_joint:evaluate", feasibility.hinge_feasibility),
+}
+
+result_fields = ["gap", "wall_thickness", "min_distance"]
+
+
+def parse_range(text):
+    """`start:stop:count` (inclusive linspace) or a comma-separated list"""
+    if ":" in text:
+        start, stop, count = text.split(":")
+        return [float(v) for v in np.linspace(float(start), float(stop), int(count))]
+    return [float(v) for v in text.split(",")]
+
+
+def grid(ranges):
+    """Every combination of `ranges` ({name: values}) as a list of dicts"""
+    names = list(ranges)
+    return [dict(zip(names, values)) for values in itertools.product(*ranges.values())]
+
+
+def variant_id(joint, params):
+    """Stable short id of one variant, used for resuming and export folders"""
+    payload = json.dumps([joint, params], sort_keys=True)
+    return hashlib.sha1(payload.encode()).hexdigest()[:12]
+
+
+def _run(conn, target, kwargs):
+    """Worker entry point: send back ("ok", row) or ("error", message)"""
+    try:
+        module, name = target.split(":")
+        evaluate = getattr(importlib.import_module(module), name)
+        conn.send(("ok", evaluate(**kwargs)))
+    except Exception as exc:
+        conn.send(("error", f"{type(exc).__name__}: {exc}"))
+    finally:
+        conn.close()
+
+
+def _finished(out_path):
+    """Variant ids already recorded as ok or infeasible"""
+    if not os.path.exists(out_path):
+        return set()
+    with open(out_path, newline="") as f:
+        return {
+            row["variant"] for row in csv.DictReader(f)
+            if row["status"] in ("ok", "infeasible")
+        }
+
+
+def prefilter(joint, variants):
+    """
+    Analytic feasibility of every variant in one vectorized call
+    Parameters not swept take the joint module's defaults.
+    """
+    target, check = joints[joint]
+    module = importlib.import_module(target.split(":")[0])
+    names = inspect.signature(check).parameters
+    columns = {
+        name: np.array([params.get(name, getattr(module, name, None)) for params in variants],
+                       dtype=np.float64)
+        for name in names
+        if any(name in params for params in variants) or hasattr(module, name)
+    }
+    return check(**columns)
+
+
+def sweep(
+    joint,
+    ranges,
+    out_dir="sweep_out",
+    workers=None,
+    timeout=120.0,
+    export=True,
+    lod="coarse",
+    method="profile",
+    check=True,
+):
+    """
+    Evaluate every variant of `joint` over `ranges` in parallel
+    Yields one result row (dict) per variant as it finishes, after
+    appending it to results.csv. check=False skips the analytic pre-filter.
+    """
+    target, _ = joints[joint]
+    workers = workers or os.cpu_count() or 1
+    os.makedirs(out_dir, exist_ok=True)
+    out_path = os.path.join(out_dir, "results.csv")
+
+    names = list(ranges)
+    fields = ["variant", "status", "seconds", *names, *result_fields, "error"]
+    done = _finished(out_path)
+    pending = []
+    for params in grid(ranges):
+        vid = variant_id(joint, dict(params, lod=lod, method=method))
+        if vid not in done:
+            pending.append((vid, params))
+
+    is_new = not os.path.exists(out_path)
+    if not is_new:
+        with open(out_path, newline="") as f:
+            if next(csv.reader(f), None) != fields:
+                raise ValueError(f"{out_path} was written by a different sweep")
+
+    with open(out_path, "a", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=fields)
+        if is_new:
+            writer.writeheader()
+
+        # Import once here so forked workers start with the joint module loaded
+        importlib.import_module(target.split(":")[0])
+        ctx = multiprocessing.get_context()
+        running = {}  # connection -> (variant, params, process, started)
+
+        def record(vid, params, status, started, result=None, error=""):
+            row = {
+                "variant": vid,
+                "status": status,
+                "seconds": round(time.monotonic() - started, 3),
+                **params,
+                **(result or {}),
+                "error": error,
+            }
+            writer.writerow(row)
+            f.flush()
+            return row
+
+        # Reject obviously broken designs before any geometry is built
+        if check and pending:
+            report = prefilter(joint, [params for _, params in pending])
+            for index in np.flatnonzero(~report.feasible):
+                vid, params = pending[index]
+                failed = ", ".join(feasibility.failed_checks(report, index))
+                yield record(vid, params, "infeasible", time.monotonic(), error=failed)
+            pending = [task for task, ok in zip(pending, report.feasible) if ok]
+
+        while pending or running:
+            # Keep every worker slot busy
+            while pending and len(running) < workers:
+                vid, params = pending.pop(0)
+                kwargs = dict(params, lod=lod, method=method)
+                if export:
+                    kwargs["export_dir"] = os.path.join(out_dir, "parts", vid)
+                receiver, sender = ctx.Pipe(duplex=False)
+                process = ctx.Process(target=_run, args=(sender, target, kwargs), daemon=True)
+                process.start()
+                sender.close()
+                running[receiver] = (vid, params, process, time.monotonic())
+
+            deadline = min(started for *_, started in running.values()) + timeout
+            for conn in wait(list(running), timeout=max(0.0, deadline - time.monotonic())):
+                vid, params, process, started = running.pop(conn)
+                try:
+                    status, payload = conn.recv()
+                except EOFError:
+                    status, payload = "error", f"worker exited with code {process.exitcode}"
+                conn.close()
+                process.join()
+                if status == "ok":
+                    yield record(vid, params, "ok", started, result=payload)
+                else:
+                    yield record(vid, params, "error", started, error=payload)
+
+            # Kill anything past its deadline (e.g. a hung boolean)
+            now = time.monotonic()
+            for conn, (vid, params, process, started) in list(running.items()):
+                if now - started >= timeout:
+                    process.kill()
+                    process.join()
+                    conn.close()
+                    del running[conn]
+                    yield record(vid, params, "timeout", started, error=f"exceeded {timeout:g} s")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Sweep joint parameters in parallel")
+    parser.add_argument("joint", choices=sorted(joints))
+    parser.add_argument("-p", "--param", action="append", default=[], metavar="NAME=RANGE",
+                        help="start:stop:count or a comma-separated list (repeatable)")
+    parser.add_argument("-o", "--out-dir", default="sweep_out")
+    parser.add_argument("-j", "--workers", type=int, default=None)
+    parser.add_argument("-t", "--timeout", type=float, default=120.0, help="seconds per variant")
+    parser.add_argument("--lod", default="coarse", help="preset name or chordal tolerance in mm")
+    parser.add_argument("--method", choices=["profile", "csg"], default="profile")
+    parser.add_argument("--no-export", action="store_true")
+    parser.add_argument("--no-check", action="store_true", help="skip the feasibility pre-filter")
+    args = parser.parse_args(argv)
+
+    lod = args.lod if args.lod in lods else float(args.lod)
+    ranges = {}
+    for item in args.param:
+        name, _, values = item.partition("=")
+        ranges[name] = parse_range(values)
+
+    for row in sweep(
+        args.joint, ranges, args.out_dir, args.workers, args.timeout,
+        export=not args.no_export, lod=lod, method=args.method, check=not args.no_check,
+    ):
+        params = " ".join(f"{name}={row[name]:g}" for name in ranges)
+        if row["status"] == "ok":
+            print(f"{row['variant']}  {params}  gap={row['gap']:.3f}  "
+                  f"min_distance={row['min_distance']:.3f}  ({row['seconds']:.2f} s)")
+        else:
+            print(f"{row['variant']}  {params}  {row['status'].upper()}: {row['error']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+import numpy as np
+import trimesh
+
+from profiles import extrude, extrude_vertices, revolve, revolve_vertices
+
+# ========================================
+# PARAMETRIC MESH TEMPLATES
+# ========================================
+# During optimization only scalar parameters change, so each part keeps
+# fixed connectivity and its vertices are recomputed as a vectorized
+# function of the parameters. `update(**params)` rewrites the vertex
+# buffer in place; faces never change, so anything holding the template
+# (viewers, PosedMesh, distance queries) can reuse its topology.
+
+class MeshTemplate:
+    def __init__(self, faces, vertices_fn, params):
+        self.faces = np.asarray(faces, dtype=np.int64)
+        self.params = dict(params)
+        self._vertices_fn = vertices_fn
+        self.vertices = np.array(vertices_fn(**self.params), dtype=np.float64)
+
+    def update(self, **params):
+        """Rewrite the vertices for changed parameters"""
+        merged = {**self.params, **params}
+        self.vertices[...] = self._vertices_fn(**merged)
+        self.params = merged
+        return self.vertices
+
+    def to_mesh(self):
+        """Snapshot of the current design as a trimesh"""
+        return trimesh.Trimesh(self.vertices.copy(), self.faces, process=False)
+
+
+def revolved(profile_fn, sections, params):
+    """Template of `revolve(profile_fn(**params), sections)`"""
+    first = np.asarray(profile_fn(**params), dtype=np.float64)
+    on_axis = np.abs(first[:, 0]) <= 1e-12
+    faces = revolve(first, sections).faces
+
+    def vertices(**p):
+        return revolve_vertices(profile_fn(**p), sections, on_axis)
+
+    return MeshTemplate(faces, vertices, params)
+
+
+def extruded(profile_fn, caps, params, axis=2, center=False):
+    """Template of `extrude(*profile_fn(**params), ...)`; profile_fn returns (profile, height)"""
+    profile, height = profile_fn(**params)
+    faces = extrude(profile, height, axis, center, caps).faces
+
+    def vertices(**p):
+        return extrude_vertices(*profile_fn(**p), axis, center)
+
+    return MeshTemplate(faces, vertices, params)
+
+
+def affine(mesh, transform_fn, params):
+    """
+    Template of a fixed mesh under a per-axis scale and offset
+    transform_fn(**params) returns (scale, offset), each (3,)
+    """
+    rest = np.array(mesh.vertices, dtype=np.float64)
+
+    def vertices(**p):
+        scale, offset = transform_fn(**p)
+        return rest * scale + offset
+
+    return MeshTemplate(mesh.faces, vertices, params)
+
+
+def combined(templates):
+    """One template over several parts sharing the same parameters"""
+    offsets = np.cumsum([0] + [len(t.vertices) for t in templates[:-1]])
+    faces = np.vstack([t.faces + offset for t, offset in zip(templates, offsets)])
+    params = {}
+    for t in templates:
+        params.update(t.params)
+
+    def vertices(**p):
+        return np.vstack([
+            t._vertices_fn(**{k: p[k] for k in t.params})
+            for t in templates
+        ])
+
+    return MeshTemplate(faces, vertices, params)
@@ -0,0 +1,67 @@
+from functools import lru_cache
+
+import numpy as np
+
+# ========================================
+# TOLERANCE-DRIVEN LEVEL OF DETAIL
+# ========================================
+# Vertices sit on the ideal surface and faces are inscribed, so the
+# chordal deviation of a feature is radius * (1 - inradius ratio). A level
+# of detail is a maximum deviation in mm (or a named preset); each feature
+# gets the coarsest tessellation that stays within it. `lod=None` keeps
+# the builder's fixed default.
+lods = {
+    "coarse": 0.05,  # sweeps, collision checks, viewer
+    "fine": 0.005,   # print export
+}
+
+
+@lru_cache(maxsize=None)
+def icosphere_inradius_ratio(subdivisions):
+    """Smallest face-plane distance of a unit icosphere"""
+    import trimesh
+
+    sphere = trimesh.creation.icosphere(subdivisions=subdivisions)
+    centers = sphere.triangles_center
+    normals = sphere.face_normals
+    return float(np.min(np.einsum("ij,ij->i", centers, normals)))
+
+
+def polygon_inradius_ratio(sections):
+    """Apothem of a regular polygon with unit circumradius"""
+    return float(np.cos(np.pi / sections))
+
+
+def revolved_inradius_ratio(sections):
+    """Face-plane distance of a unit sphere revolved from a `sections`-gon profile"""
+    return float(np.cos(np.pi / sections) ** 2)
+
+
+def tolerance(lod):
+    """Chordal tolerance in mm for a preset name or a number"""
+    return lods[lod] if isinstance(lod, str) else float(lod)
+
+
+def sections_for(radius, lod=None, default=64, sphere=False):
+    """
+    Polygon count for a circle (or revolved sphere) of `radius`
+    Rounded up to a multiple of 4 so quarter arcs land on vertices.
+    """
+    if lod is None:
+        return default
+    # Largest allowed polygon ratio; a revolved sphere pays it twice
+    deviation = min(tolerance(lod) / radius, 1.0)
+    ratio = np.sqrt(1 - deviation) if sphere else 1 - deviation
+    sections = int(np.ceil(np.pi / np.arccos(ratio)))
+    return max(8, -(-sections // 4) * 4)
+
+
+def subdivisions_for(radius, lod=None, default=3, max_subdivisions=7):
+    """Icosphere subdivision level for a sphere of `radius`"""
+    if lod is None:
+        return default
+    limit = tolerance(lod)
+    for subdivisions in range(max_subdivisions):
+        if radius * (1 - icosphere_inradius_ratio(subdivisions)) <= limit:
+            return subdivisions
+    return max_subdivisions
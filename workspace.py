@@ -0,0 +1,123 @@
+from collections import namedtuple
+
+import numpy as np
+
+# ========================================
+# REACHABLE WORKSPACE (SPARSE VOXEL MAP)
+# ========================================
+# Samples the joint space of a KinematicTree with a scrambled Sobol
+# sequence, runs batched FK + Jacobians on each chunk and bins the
+# tracked point into a sparse voxel grid. Only occupied voxels are kept
+# (sorted packed keys plus per-voxel accumulators), and every chunk is
+# reduced into them before the next one is drawn, so memory depends on
+# the reachable volume and the chunk size, never on the sample count.
+#
+# Per voxel:
+#   count          samples that landed in it
+#   manipulability mean sqrt(det(J J^T)) of the point's linear Jacobian
+#                  (mm per degree / mm mixed, as the joint values)
+#   dexterity      fraction of the 64 equal-area direction bins that the
+#                  link's `axis` reached there (1.0 = any approach direction)
+WorkspaceMap = namedtuple("WorkspaceMap", [
+    "voxel_size", "voxels", "centers", "count", "manipulability", "dexterity", "volume", "samples",
+])
+
+direction_bins = 64  # 8 z-bands (equal area) x 8 azimuth sectors
+_BITS = 21           # per axis in a packed voxel key
+_OFFSET = 1 << (_BITS - 1)
+
+
+def _pack(ijk):
+    ijk = ijk + _OFFSET
+    if ijk.min(initial=0) < 0 or ijk.max(initial=0) >= 1 << _BITS:
+        raise ValueError("workspace too large for the voxel size")
+    return (ijk[:, 0] << 2 * _BITS) | (ijk[:, 1] << _BITS) | ijk[:, 2]
+
+
+def _unpack(keys):
+    mask = (1 << _BITS) - 1
+    return np.column_stack([keys >> 2 * _BITS, (keys >> _BITS) & mask, keys & mask]) - _OFFSET
+
+
+def _direction_bin(directions):
+    """Equal-area bin (0..63) of unit vectors"""
+    band = np.minimum(((directions[:, 2] + 1) * 4).astype(np.int64), 7)
+    sector = np.minimum(((np.arctan2(directions[:, 1], directions[:, 0]) + np.pi) / (2 * np.pi) * 8)
+                        .astype(np.int64), 7)
+    return band * 8 + sector
+
+
+def _reduce(keys, count, manipulability, mask):
+    """Merge rows with equal keys: sum count/manipulability, OR the masks"""
+    order = np.argsort(keys, kind="stable")
+    keys = keys[order]
+    starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+    return (
+        keys[starts],
+        np.add.reduceat(count[order], starts),
+        np.add.reduceat(manipulability[order], starts),
+        np.bitwise_or.reduceat(mask[order], starts),
+    )
+
+
+def workspace(
+    tree,
+    link,
+    point=(0, 0, 0),
+    samples=1_000_000,
+    voxel_size=1.0,
+    axis=(0, 0, 1),
+    chunk=2 ** 16,
+    seed=0,
+):
+    """
+    Sparse voxel map of where `point` (in `link`'s frame) can reach
+    Every DOF is sampled between its limits, which must be finite.
+    `samples` is rounded up to whole chunks; `chunk` must be a power of
+    two to keep the Sobol sequence balanced.
+    """
+    if not np.all(np.isfinite(tree.lower) & np.isfinite(tree.upper)):
+        raise ValueError("workspace sampling needs finite limits on every DOF")
+    if chunk & (chunk - 1):
+        raise ValueError("chunk must be a power of two")
+    # scipy.stats takes ~0.5 s to import; keep it off the import path of the joint scripts
+    from scipy.stats import qmc
+
+    sampler = qmc.Sobol(len(tree.dofs), scramble=True, seed=seed)
+    axis = np.asarray(axis, dtype=np.float64)
+    axis = axis / np.linalg.norm(axis)
+
+    keys = np.zeros(0, dtype=np.int64)
+    count = np.zeros(0, dtype=np.int64)
+    manipulability = np.zeros(0)
+    mask = np.zeros(0, dtype=np.uint64)
+    chunks = -(-samples // chunk)
+    for _ in range(chunks):
+        q = qmc.scale(sampler.random(chunk), tree.lower, tree.upper)
+        jac = tree.jacobian(q, link, point)
+
+        J = jac.matrix[:, :3]
+        m = np.sqrt(np.maximum(np.linalg.det(J @ J.transpose(0, 2, 1)), 0.0))
+        directions = jac.frame[:, :3, :3] @ axis
+        bits = np.left_shift(np.uint64(1), _direction_bin(directions).astype(np.uint64))
+        chunk_keys = _pack(np.floor(jac.position / voxel_size).astype(np.int64))
+
+        keys, count, manipulability, mask = _reduce(
+            np.concatenate([keys, chunk_keys]),
+            np.concatenate([count, np.ones(chunk, dtype=np.int64)]),
+            np.concatenate([manipulability, m]),
+            np.concatenate([mask, bits]),
+        )
+
+    voxels = _unpack(keys)
+    reached = np.unpackbits(mask.view(np.uint8)).reshape(-1, 64).sum(axis=1)
+    return WorkspaceMap(
+        voxel_size=voxel_size,
+        voxels=voxels,
+        centers=(voxels + 0.5) * voxel_size,
+        count=count,
+        manipulability=manipulability / count,
+        dexterity=reached / direction_bins,
+        volume=len(keys) * voxel_size ** 3,
+        samples=chunks * chunk,
+    )